@@ -1,34 +1,93 @@
 from __future__ import annotations
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 import logging
 
-from .const import DOMAIN, PLATFORMS
+from .const import (
+    ATTR_ENTRY_ID,
+    ATTR_VALUES,
+    CONF_MODEL,
+    DEFAULT_MODEL,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_WRITE_REGISTERS,
+    STORAGE_VERSION,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+WRITE_REGISTERS_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_ENTRY_ID): cv.string,
+    vol.Required(ATTR_VALUES): vol.All(dict, vol.Length(min=1)),
+})
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async def _write_registers(call: ServiceCall) -> None:
+        coordinators = hass.data.get(DOMAIN, {})
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        if entry_id is None:
+            # Profiles differ per model, so the same values must not go to every unit.
+            if len(coordinators) != 1:
+                raise ServiceValidationError(
+                    f"{len(coordinators)} heat pumps are loaded; select one with '{ATTR_ENTRY_ID}'"
+                )
+            entry_id = next(iter(coordinators))
+        elif entry_id not in coordinators:
+            raise ServiceValidationError(f"Unknown or unloaded config entry '{entry_id}'")
+        await coordinators[entry_id].async_write_registers(call.data[ATTR_VALUES])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_WRITE_REGISTERS, _write_registers, schema=WRITE_REGISTERS_SCHEMA
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     from .coordinator import ED300Coordinator  # lazy import
+    from .profile import ProfileError, async_load_profile
 
-    coordinator = ED300Coordinator(hass, entry)
+    model = str({**entry.data, **entry.options}.get(CONF_MODEL, DEFAULT_MODEL))
+    # Parsed and validated in the executor, then served from the cache on reloads.
     try:
-        # Erster Refresh darf schiefgehen, wir loggen nur und fahren fort.
-        await coordinator.async_config_entry_first_refresh()
-    except Exception as err:  # noqa: BLE001
-        _LOGGER.warning("Initial refresh failed (will retry in background): %s", err)
+        profile = await async_load_profile(hass, model)
+    except ProfileError as err:
+        # A broken profile will not fix itself by retrying.
+        raise ConfigEntryError(str(err)) from err
+
+    coordinator = ED300Coordinator(hass, entry, profile)
+    # Entities start from the last persisted values; the first sweep runs in the
+    # background, so startup does not wait for the bus.
+    if not await coordinator.async_restore_snapshot():
+        _LOGGER.debug("No stored snapshot for %s, entities stay unknown until the first poll", entry.title)
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+    )
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    if coordinator.pv_controller is not None:
+        entry.async_on_unload(coordinator.pv_controller.async_start())
+    if coordinator.sampler is not None:
+        entry.async_on_unload(coordinator.sampler.async_start())
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Poll intervals are fixed at coordinator init – reload to apply changed options.
+    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
     return True
 
+async def _async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     coordinator = hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
     if coordinator is not None:
         await coordinator.async_close()
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    # Drop the persisted snapshot together with the entry.
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import time
+
+from .const import (
+    ADAPTIVE_BURST_DURATION,
+    ADAPTIVE_BURST_INTERVAL,
+    ADAPTIVE_MAX_ERROR_RATE,
+    ADAPTIVE_MAX_FACTOR,
+    ADAPTIVE_MAX_LATENCY,
+)
+
+
+class AdaptivePolling:
+    """Stretch or shrink the poll intervals from measured bus latency and error rate.
+
+    The configured intervals are the floor: a saturated or flaky link doubles
+    a multiplier (up to ``ADAPTIVE_MAX_FACTOR``), every healthy poll halves it
+    again. After a write or a watched register change, a burst polls the fast
+    tier at ``ADAPTIVE_BURST_INTERVAL`` for ``ADAPTIVE_BURST_DURATION`` seconds.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.factor = 1.0
+        self._burst_until = 0.0
+
+    @property
+    def bursting(self) -> bool:
+        return self.enabled and self._burst_until > time.monotonic()
+
+    def trigger_burst(self) -> None:
+        if self.enabled:
+            self._burst_until = time.monotonic() + ADAPTIVE_BURST_DURATION
+
+    def record_poll(self, latency: float | None, error_rate: float) -> None:
+        """Feed the mean request round-trip time (s) and failed share of one poll."""
+
+        if not self.enabled:
+            return
+        if error_rate > ADAPTIVE_MAX_ERROR_RATE or (latency is not None and latency > ADAPTIVE_MAX_LATENCY):
+            self.factor = min(ADAPTIVE_MAX_FACTOR, self.factor * 2)
+            # A struggling gateway gets no burst traffic on top.
+            self._burst_until = 0.0
+        else:
+            self.factor = max(1.0, self.factor / 2)
+
+    def scale(self, interval: float) -> float:
+        return interval * self.factor
+
+    def tick(self, base: float) -> float:
+        """Coordinator update interval for a configured base tick."""
+
+        if self.bursting:
+            return min(base, ADAPTIVE_BURST_INTERVAL)
+        return self.scale(base)
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import HVACMode, ClimateEntityFeature
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import callback
 
 from .const import DOMAIN
 from .coordinator import ED300Coordinator
+from .entity import ED300Entity
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator: ED300Coordinator = hass.data[DOMAIN][entry.entry_id]
@@ -13,27 +15,31 @@ async def async_setup_entry(hass, entry, async_add_entities):
     if c:
         async_add_entities([ED300Climate(coordinator, c)])
 
-class ED300Climate(CoordinatorEntity[ED300Coordinator], ClimateEntity):
-    _attr_has_entity_name = True
+class ED300Climate(ED300Entity, ClimateEntity):
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_supported_features = (
+        ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TURN_OFF
+    )
+    _enable_turn_on_off_backwards_compatibility = False
 
     def __init__(self, coordinator: ED300Coordinator, cfg: dict) -> None:
-        super().__init__(coordinator)
+        self.setpoint_register = int(cfg["setpoint_register"])  # holding
+        # The writable profile register behind the setpoint supplies key, range and scaling.
+        self.setpoint_key = next(
+            (reg.key for reg in coordinator.profile.writable_by_key.values() if reg.address == self.setpoint_register),
+            "setpoint",
+        )
+        super().__init__(coordinator, (self.setpoint_key, cfg.get("current_temp_key", "ww_temp")))
         self.cfg = cfg
         self._attr_name = cfg.get("name", "Warmwasser")
         self._attr_unique_id = f"{coordinator.host}-{coordinator.unit_id}-climate-{cfg.get('key','wh')}"
-        self._attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
         self._attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
         self._attr_min_temp = float(cfg.get("min_temp", 5))
         self._attr_max_temp = float(cfg.get("max_temp", 62))
         self._attr_precision = float(cfg.get("precision", 1))
-        self.setpoint_register = int(cfg["setpoint_register"])  # holding
         self.current_temp_key = cfg.get("current_temp_key", "ww_temp")
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, f"{coordinator.host}:{coordinator.unit_id}")},
-            "manufacturer": coordinator.device["manufacturer"],
-            "model": coordinator.device["model"],
-            "name": "EcoDesign ED300",
-        }
+        # Setpoint restored by "on": the last one seen while heating.
+        self._resume_temperature: float | None = None
 
     @property
     def hvac_mode(self):
@@ -42,21 +48,33 @@ class ED300Climate(CoordinatorEntity[ED300Coordinator], ClimateEntity):
 
     @property
     def target_temperature(self):
-        return self.coordinator.data.get("setpoint")
+        return self._value(self.setpoint_key)
 
     @property
     def current_temperature(self):
-        return self.coordinator.data.get(self.current_temp_key)
+        return self._value(self.current_temp_key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.hvac_mode == HVACMode.HEAT:
+            self._resume_temperature = self.target_temperature
+        super()._handle_coordinator_update()
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         if hvac_mode == HVACMode.OFF:
             await self.coordinator.async_write_register(self.setpoint_register, 0)
-        else:
-            return
+        elif self.hvac_mode == HVACMode.OFF and self._resume_temperature is not None:
+            await self.coordinator.async_write_registers({self.setpoint_key: self._resume_temperature})
+
+    async def async_turn_on(self) -> None:
+        await self.async_set_hvac_mode(HVACMode.HEAT)
+
+    async def async_turn_off(self) -> None:
+        await self.async_set_hvac_mode(HVACMode.OFF)
 
     async def async_set_temperature(self, **kwargs) -> None:
         value = kwargs.get("temperature")
         if value is None:
             return
-        raw = int(round(value / 1))
-        await self.coordinator.async_write_register(self.setpoint_register, raw)
+        # Thermostat card clicks are coalesced: only the last setpoint is written.
+        await self.coordinator.async_write_coalesced({self.setpoint_key: value})
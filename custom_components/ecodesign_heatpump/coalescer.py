@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+
+from .const import WRITE_SETTLE_DELAY, WRITE_SETTLE_MAX
+
+
+@dataclass(slots=True)
+class _Pending:
+    words: list[int]
+    due: float  # monotonic: settle window after the newest value
+    deadline: float  # monotonic: latest flush, counted from the first value
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+
+    @property
+    def flush_at(self) -> float:
+        return min(self.due, self.deadline)
+
+
+class WriteCoalescer:
+    """Last-write-wins buffer for interactively changed holding registers.
+
+    Slider drags and thermostat clicks produce a value per step. Each register
+    keeps only its newest words and goes to the bus once no newer value arrived
+    for ``WRITE_SETTLE_DELAY`` seconds (or ``WRITE_SETTLE_MAX`` after its first
+    pending value, so a continuous drag still gets written). Registers that
+    settle together are written in one call. Every caller waits for the write
+    that carries its register's final value and sees that write's error.
+    """
+
+    def __init__(self, hass: HomeAssistant, write: Callable[[dict[int, int]], Awaitable[Any]]) -> None:
+        self.hass = hass
+        self._write = write
+        self._pending: dict[int, _Pending] = {}  # register start address -> newest words
+        self._unsub: CALLBACK_TYPE | None = None
+        self.submitted = 0
+        self.written = 0  # registers actually written; submitted - written were superseded
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending_words(self) -> dict[int, int]:
+        """``address -> word`` of every value not yet on the bus (for optimistic overlays)."""
+
+        return {
+            address + offset: word
+            for address, pending in self._pending.items()
+            for offset, word in enumerate(pending.words)
+        }
+
+    def submit(self, address: int, words: list[int]) -> asyncio.Future[None]:
+        now = time.monotonic()
+        future: asyncio.Future[None] = self.hass.loop.create_future()
+        pending = self._pending.get(address)
+        if pending is None:
+            pending = self._pending[address] = _Pending(words, now + WRITE_SETTLE_DELAY, now + WRITE_SETTLE_MAX)
+        else:
+            pending.words = words
+            pending.due = now + WRITE_SETTLE_DELAY
+        pending.waiters.append(future)
+        self.submitted += 1
+        self._arm()
+        return future
+
+    def discard(self, addresses: Iterable[int]) -> None:
+        """Drop pending values overwritten by a direct write; their callers count as done."""
+
+        for address in set(addresses):
+            for start in [start for start, p in self._pending.items() if start <= address < start + len(p.words)]:
+                _resolve(self._pending.pop(start).waiters, None)
+        self._arm()
+
+    def _arm(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._pending:
+            delay = max(0.0, min(p.flush_at for p in self._pending.values()) - time.monotonic())
+            self._unsub = async_call_later(self.hass, delay, self._async_fire)
+
+    async def _async_fire(self, _now: Any = None) -> None:
+        self._unsub = None
+        # A little slack: the timer may fire a hair before the monotonic deadline.
+        now = time.monotonic() + 0.01
+        await self._async_flush([address for address, p in self._pending.items() if p.flush_at <= now])
+        self._arm()
+
+    async def async_flush(self) -> None:
+        """Write everything pending now (unload)."""
+
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self._async_flush(list(self._pending))
+
+    async def _async_flush(self, addresses: list[int]) -> None:
+        batch = [(address, self._pending.pop(address)) for address in addresses]
+        if not batch:
+            return
+        raw = {
+            address + offset: word for address, pending in batch for offset, word in enumerate(pending.words)
+        }
+        waiters = [waiter for _, pending in batch for waiter in pending.waiters]
+        self.written += len(batch)
+        try:
+            await self._write(raw)
+        except Exception as err:  # noqa: BLE001
+            _resolve(waiters, err)
+        else:
+            _resolve(waiters, None)
+
+
+def _resolve(waiters: Iterable[asyncio.Future[None]], error: BaseException | None) -> None:
+    for waiter in waiters:
+        if waiter.done():
+            continue  # caller gave up (cancelled)
+        if error is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(error)
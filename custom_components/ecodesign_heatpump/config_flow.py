@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from typing import Any
 import logging
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.const import MAJOR_VERSION, MINOR_VERSION
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv, selector
 
 from .const import (
     DOMAIN,
@@ -16,74 +19,395 @@ from .const import (
     CONF_UNIT_ID,
     CONF_SCAN_INTERVAL,
     CONF_MODEL,
+    CONF_FAST_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_ADAPTIVE_POLLING,
+    CONF_BUS_TRACE,
     DEFAULT_PORT,
     DEFAULT_UNIT_ID,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_MODEL,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_BUS_TRACE,
+    CONF_INPUT_RANGE,
+    CONF_HOLDING_RANGE,
+    CONF_DISCOVERY_SAMPLES,
+    CONF_DISCOVERY_INTERVAL,
+    CONF_TRANSPORT,
+    CONF_DEVICE,
+    CONF_BAUDRATE,
+    CONF_PARITY,
+    CONF_STOPBITS,
+    CONF_BYTESIZE,
+    CONF_FRAME_DELAY,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_READ_GAP,
+    CONF_LINK_LATENCY,
+    DEFAULT_BAUDRATE,
+    DEFAULT_PARITY,
+    DEFAULT_STOPBITS,
+    DEFAULT_BYTESIZE,
+    CONF_PV_GRID_ENTITY,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SAMPLE_KEYS,
+    CONF_SAMPLE_PUBLISH_INTERVAL,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLE_PUBLISH_INTERVAL,
+    CONF_PV_EXPORT_POSITIVE,
+    CONF_PV_WINDOW,
+    CONF_PV_HYSTERESIS,
+    CONF_PV_WP_POWER,
+    CONF_PV_EL_POWER,
+    CONF_PV_MIN_SWITCH_INTERVAL,
+    DEFAULT_PV_EXPORT_POSITIVE,
+    DEFAULT_PV_WINDOW,
+    DEFAULT_PV_HYSTERESIS,
+    DEFAULT_PV_WP_POWER,
+    DEFAULT_PV_EL_POWER,
+    DEFAULT_PV_MIN_SWITCH_INTERVAL,
+    PRIORITY_BACKGROUND,
+    TRANSPORTS,
+    TRANSPORT_DEFAULTS,
+    TRANSPORT_SERIAL,
+    TRANSPORT_TCP,
 )
+from .discovery import DEFAULT_RANGES, discover, draft_profile
 
 _LOGGER = logging.getLogger(__name__)
 
-async def _probe_tcp(host: str, port: int) -> None:
-    """Raw TCP connect test to avoid dependency timing issues."""
+# async_show_progress takes the task (and advances the flow itself) since 2024.8.
+_PROGRESS_TASK = (MAJOR_VERSION, MINOR_VERSION) >= (2024, 8)
+
+async def _async_probe_link(
+    hass: HomeAssistant, config: dict[str, Any], connection: Any | None = None
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Modbus handshake with the configured unit; returns (measured link settings, errors).
+
+    Without ``connection`` the link is opened from ``config`` (and shared with
+    any entry already using it) for the duration of the probe.
+    """
+
+    # Lazy: keeps pymodbus out of the flow import (see async_setup_entry).
+    from .connection import async_acquire_entry_connection, async_release_connection
+    from .probe import ProbeError, async_probe
+    from .profile import ProfileError, async_load_profile
+
     try:
-        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=5.0)
-        writer.close()
-        try:
-            await writer.wait_closed()
-        except Exception:  # pragma: no cover
-            pass
-    except Exception as err:
-        # Re-raise for caller to map to cannot_connect
-        raise asyncio.TimeoutError(str(err))
+        profile = await async_load_profile(hass, str(config.get(CONF_MODEL, DEFAULT_MODEL)))
+    except ProfileError as err:
+        _LOGGER.error("Cannot probe, profile invalid: %s", err)
+        return {}, {"base": "invalid_profile"}
+
+    owned = connection is None
+    if owned:
+        connection = async_acquire_entry_connection(hass, config)
+    try:
+        result = await async_probe(connection, int(config[CONF_UNIT_ID]), profile)
+    except ProbeError as err:
+        _LOGGER.warning("Link probe failed: %s", err)
+        return {}, {"base": err.reason}
+    except Exception as err:  # ultra safe
+        _LOGGER.exception("Unexpected error during link probe: %s", err)
+        return {}, {"base": "cannot_connect"}
+    finally:
+        if owned:
+            await async_release_connection(hass, connection)
+    return result.as_config(), {}
 
 class ED300ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     MINOR_VERSION = 0
 
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """First step: transport, unit and model; the link details follow per transport."""
+
+        if user_input is not None:
+            self._data = dict(user_input)
+            if user_input[CONF_TRANSPORT] == TRANSPORT_SERIAL:
+                return await self.async_step_serial()
+            return await self.async_step_tcp()
+
+        schema = vol.Schema({
+            vol.Required(CONF_TRANSPORT, default=TRANSPORT_TCP): vol.In(TRANSPORTS),
+            vol.Required(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): int,
+            vol.Optional(CONF_MODEL, default=DEFAULT_MODEL): vol.In(["ED300"]),
+            vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(int, vol.Range(min=5, max=600)),
+        })
+        return self.async_show_form(step_id="user", data_schema=schema)
+
+    async def async_step_tcp(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Modbus TCP gateway or transparent RS485<->TCP bridge (RTU over TCP)."""
+
         errors: dict[str, str] = {}
 
         if user_input is not None:
             host = user_input[CONF_HOST]
             port = user_input[CONF_PORT]
-            unit_id = user_input[CONF_UNIT_ID]
-            try:
-                await _probe_tcp(host, port)
-            except asyncio.TimeoutError as err:
-                _LOGGER.warning("TCP probe failed %s:%s -> %s", host, port, err)
-                errors["base"] = "cannot_connect"
-            except Exception as err:  # ultra safe
-                _LOGGER.exception("Unexpected error during config flow probe: %s", err)
-                errors["base"] = "cannot_connect"
-            else:
-                await self.async_set_unique_id(f"{host}:{port}:{unit_id}")
-                self._abort_if_unique_id_configured()
-                return self.async_create_entry(title=f"ED300 @ {host}", data=user_input)
+            unit_id = self._data[CONF_UNIT_ID]
+            await self.async_set_unique_id(f"{host}:{port}:{unit_id}")
+            self._abort_if_unique_id_configured()
+            data = {**self._data, **user_input}
+            measured, errors = await _async_probe_link(self.hass, data)
+            if not errors:
+                return self.async_create_entry(title=f"ED300 @ {host} (unit {unit_id})", data={**data, **measured})
 
         schema = vol.Schema({
             vol.Required(CONF_HOST): str,
             vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
-            vol.Required(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): int,
-            vol.Optional(CONF_MODEL, default=DEFAULT_MODEL): vol.In(["ED300"]),
-            vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(int, vol.Range(min=5, max=600)),
         })
-        return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
+        return self.async_show_form(step_id="tcp", data_schema=schema, errors=errors)
+
+    async def async_step_serial(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """USB/RS485 adapter with RTU framing."""
+
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            device = user_input[CONF_DEVICE]
+            unit_id = self._data[CONF_UNIT_ID]
+            await self.async_set_unique_id(f"{device}:{unit_id}")
+            self._abort_if_unique_id_configured()
+            data = {**self._data, **user_input}
+            measured, errors = await _async_probe_link(self.hass, data)
+            if not errors:
+                return self.async_create_entry(title=f"ED300 @ {device} (unit {unit_id})", data={**data, **measured})
+
+        schema = vol.Schema({
+            vol.Required(CONF_DEVICE, default="/dev/ttyUSB0"): str,
+            vol.Required(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): vol.In([2400, 4800, 9600, 19200, 38400, 57600, 115200]),
+            vol.Required(CONF_PARITY, default=DEFAULT_PARITY): vol.In(["N", "E", "O"]),
+            vol.Required(CONF_STOPBITS, default=DEFAULT_STOPBITS): vol.In([1, 2]),
+            vol.Required(CONF_BYTESIZE, default=DEFAULT_BYTESIZE): vol.In([7, 8]),
+        })
+        return self.async_show_form(step_id="serial", data_schema=schema, errors=errors)
 
+    @staticmethod
     @callback
-    def async_get_options_flow(self, config_entry: config_entries.ConfigEntry):
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
         return ED300OptionsFlow(config_entry)
 
 class ED300OptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         self._entry = config_entry
+        self._measured: dict[str, Any] = {}
+        self._discovery: asyncio.Task[dict[str, str]] | None = None
+        self._discovery_seconds = 0
 
     async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        return self.async_show_menu(step_id="init", menu_options=["settings", "pv", "sampling", "probe", "discover"])
+
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            # Keep what the link probe stored next to the form fields.
+            return self.async_create_entry(title="", data={**self._entry.options, **user_input})
 
         data = {**self._entry.data, **(self._entry.options or {})}
+        frame_delay, max_block_size, _ = TRANSPORT_DEFAULTS[data.get(CONF_TRANSPORT, TRANSPORT_TCP)]
         schema = vol.Schema({
             vol.Optional(CONF_SCAN_INTERVAL, default=data.get("scan_interval", DEFAULT_SCAN_INTERVAL)): vol.All(int, vol.Range(min=5, max=600)),
+            vol.Optional(CONF_FAST_INTERVAL, default=data.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)): vol.All(int, vol.Range(min=1, max=600)),
+            vol.Optional(CONF_SLOW_INTERVAL, default=data.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL)): vol.All(int, vol.Range(min=30, max=3600)),
+            vol.Optional(CONF_ADAPTIVE_POLLING, default=data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)): bool,
+            vol.Optional(CONF_FRAME_DELAY, default=data.get(CONF_FRAME_DELAY, frame_delay)): vol.All(int, vol.Range(min=0, max=1000)),
+            vol.Optional(CONF_MAX_BLOCK_SIZE, default=data.get(CONF_MAX_BLOCK_SIZE, max_block_size)): vol.All(int, vol.Range(min=1, max=125)),
+            vol.Optional(CONF_BUS_TRACE, default=data.get(CONF_BUS_TRACE, DEFAULT_BUS_TRACE)): bool,
+        })
+        return self.async_show_form(step_id="settings", data_schema=schema)
+
+    async def async_step_pv(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """PV-surplus controller: grid sensor and control parameters; no sensor = off."""
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if coordinator is None:
+            return self.async_abort(reason="not_loaded")
+        if coordinator.profile.pv is None:
+            return self.async_abort(reason="pv_not_supported")
+
+        if user_input is not None:
+            options = {**self._entry.options}
+            # An emptied entity field is simply missing from the input.
+            options.pop(CONF_PV_GRID_ENTITY, None)
+            return self.async_create_entry(title="", data={**options, **user_input})
+
+        data = {**self._entry.data, **(self._entry.options or {})}
+        entity = data.get(CONF_PV_GRID_ENTITY)
+        schema = vol.Schema({
+            vol.Optional(CONF_PV_GRID_ENTITY, description={"suggested_value": entity}): selector.EntitySelector(
+                selector.EntitySelectorConfig(domain="sensor", device_class="power")
+            ),
+            vol.Optional(CONF_PV_EXPORT_POSITIVE, default=data.get(CONF_PV_EXPORT_POSITIVE, DEFAULT_PV_EXPORT_POSITIVE)): bool,
+            vol.Optional(CONF_PV_WINDOW, default=data.get(CONF_PV_WINDOW, DEFAULT_PV_WINDOW)): vol.All(int, vol.Range(min=10, max=1800)),
+            vol.Optional(CONF_PV_HYSTERESIS, default=data.get(CONF_PV_HYSTERESIS, DEFAULT_PV_HYSTERESIS)): vol.All(int, vol.Range(min=0, max=5000)),
+            vol.Optional(CONF_PV_WP_POWER, default=data.get(CONF_PV_WP_POWER, DEFAULT_PV_WP_POWER)): vol.All(int, vol.Range(min=50, max=10000)),
+            vol.Optional(CONF_PV_EL_POWER, default=data.get(CONF_PV_EL_POWER, DEFAULT_PV_EL_POWER)): vol.All(int, vol.Range(min=50, max=10000)),
+            vol.Optional(CONF_PV_MIN_SWITCH_INTERVAL, default=data.get(CONF_PV_MIN_SWITCH_INTERVAL, DEFAULT_PV_MIN_SWITCH_INTERVAL)): vol.All(int, vol.Range(min=30, max=3600)),
         })
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="pv", data_schema=schema)
+
+    async def async_step_sampling(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """High-rate sampling: sensors sampled every few seconds into hourly statistics; none = off."""
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if coordinator is None:
+            return self.async_abort(reason="not_loaded")
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**self._entry.options, **user_input})
+
+        data = {**self._entry.data, **(self._entry.options or {})}
+        # Numeric sensors only; selects and bitfields have no meaningful mean.
+        sensors = {
+            reg.key: reg.name
+            for reg in coordinator.profile.iter_registers(("sensors",))
+            if not reg.options and not reg.bits
+        }
+        schema = vol.Schema({
+            vol.Optional(CONF_SAMPLE_KEYS, default=[key for key in data.get(CONF_SAMPLE_KEYS, []) if key in sensors]): cv.multi_select(sensors),
+            vol.Optional(CONF_SAMPLE_INTERVAL, default=data.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)): vol.All(int, vol.Range(min=1, max=60)),
+            vol.Optional(CONF_SAMPLE_PUBLISH_INTERVAL, default=data.get(CONF_SAMPLE_PUBLISH_INTERVAL, DEFAULT_SAMPLE_PUBLISH_INTERVAL)): vol.All(int, vol.Range(min=10, max=3600)),
+        })
+        return self.async_show_form(step_id="sampling", data_schema=schema)
+
+    async def async_step_probe(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Re-measure the link over the running connection and store the tuned block limits."""
+
+        if user_input is not None:
+            # Reloads the entry, which rebuilds the read plan.
+            return self.async_create_entry(title="", data={**self._entry.options, **self._measured})
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if coordinator is None:
+            return self.async_abort(reason="not_loaded")
+        config = {**self._entry.data, **self._entry.options}
+        self._measured, errors = await _async_probe_link(self.hass, config, coordinator.connection)
+        if errors:
+            return self.async_abort(reason=errors["base"])
+        return self.async_show_form(
+            step_id="probe",
+            data_schema=vol.Schema({}),
+            description_placeholders={
+                "latency": str(self._measured[CONF_LINK_LATENCY]),
+                "block": str(self._measured[CONF_MAX_BLOCK_SIZE]),
+                "gap": str(self._measured[CONF_MAX_READ_GAP]),
+                "current_block": str(coordinator.max_block_size),
+                "current_gap": str(coordinator.max_read_gap),
+            },
+        )
+
+    async def async_step_discover(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Scan the device for mapped registers and save a draft profile to the config directory."""
+
+        if self._discovery is not None:
+            # Called again by the flow manager once the scan task finished.
+            if not self._discovery.done():
+                return self._async_show_discovery()
+            return self.async_show_progress_done(next_step_id="discover_done")
+
+        coordinator = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if coordinator is None:
+            return self.async_abort(reason="not_loaded")
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            ranges = {
+                reg_type: _parse_range(user_input[key])
+                for reg_type, key in (("input", CONF_INPUT_RANGE), ("holding", CONF_HOLDING_RANGE))
+                if user_input.get(key)
+            }
+            if any(r is None for r in ranges.values()):
+                errors["base"] = "invalid_range"
+            else:
+                samples = user_input[CONF_DISCOVERY_SAMPLES]
+                interval = user_input[CONF_DISCOVERY_INTERVAL]
+                self._discovery_seconds = (samples - 1) * interval
+                # Sweep plus samples x interval can take many minutes; the frontend shows progress meanwhile.
+                self._discovery = self.hass.async_create_task(
+                    self._async_discover(coordinator, ranges, samples, interval), f"{DOMAIN} register discovery"
+                )
+                if not _PROGRESS_TASK:
+                    self._discovery.add_done_callback(self._async_discovery_finished)
+                return self._async_show_discovery()
+
+        schema = vol.Schema({
+            vol.Optional(CONF_INPUT_RANGE, default=_format_range(DEFAULT_RANGES["input"])): str,
+            vol.Optional(CONF_HOLDING_RANGE, default=_format_range(DEFAULT_RANGES["holding"])): str,
+            vol.Optional(CONF_DISCOVERY_SAMPLES, default=3): vol.All(int, vol.Range(min=1, max=20)),
+            vol.Optional(CONF_DISCOVERY_INTERVAL, default=5): vol.All(int, vol.Range(min=1, max=60)),
+        })
+        return self.async_show_form(step_id="discover", data_schema=schema, errors=errors)
+
+    async def async_step_discover_done(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        task, self._discovery = self._discovery, None
+        try:
+            placeholders = task.result()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Register discovery failed: %s", err)
+            return self.async_abort(reason="cannot_connect")
+        return self.async_abort(reason="discovery_saved", description_placeholders=placeholders)
+
+    async def _async_discover(
+        self, coordinator: Any, ranges: dict[str, tuple[int, int]], samples: int, interval: int
+    ) -> dict[str, str]:
+        from .connection import ModbusTimeoutError  # lazy, see _async_probe_link
+
+        async def _read(reg_type: str, address: int, count: int) -> list[int] | None:
+            # Background priority: regular polling and user writes keep working during the scan.
+            try:
+                return await coordinator.connection.async_read(
+                    reg_type, address, count, coordinator.unit_id, PRIORITY_BACKGROUND
+                )
+            except ModbusTimeoutError as err:
+                # Provoked by the scan: keep the unit out of backoff so polling goes on.
+                coordinator.connection.reset_backoff(coordinator.unit_id)
+                raise asyncio.TimeoutError(str(err)) from err
+
+        result = await discover(_read, ranges, samples=samples, interval=interval)
+        profile = draft_profile(result, f"{coordinator.model} (discovered)")
+        path = self.hass.config.path(f"{DOMAIN}_discovered_{coordinator.unit_id}.json")
+        text = json.dumps(profile, indent=2, ensure_ascii=False)
+        await self.hass.async_add_executor_job(_write_text, path, text)
+        return {"path": path, "registers": str(len(result.samples)), "requests": str(result.requests)}
+
+    @callback
+    def _async_show_discovery(self) -> FlowResult:
+        kwargs: dict[str, Any] = {"progress_task": self._discovery} if _PROGRESS_TASK else {}
+        return self.async_show_progress(
+            step_id="discover",
+            progress_action="discover",
+            description_placeholders={"seconds": str(self._discovery_seconds)},
+            **kwargs,
+        )
+
+    @callback
+    def _async_discovery_finished(self, task: asyncio.Task) -> None:
+        # Before 2024.8 the flow has to be advanced by hand once the task is done.
+        if not task.cancelled():
+            self.hass.async_create_task(self.hass.config_entries.options.async_configure(self.flow_id))
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop a running scan when the dialog is closed."""
+
+        if self._discovery is not None and not self._discovery.done():
+            self._discovery.cancel()
+
+def _parse_range(text: str) -> tuple[int, int] | None:
+    """"start-end" (end exclusive) -> (start, end); None if malformed."""
+    start, _, end = text.partition("-")
+    try:
+        bounds = int(start), int(end)
+    except ValueError:
+        return None
+    return bounds if 0 <= bounds[0] < bounds[1] <= 0x10000 else None
+
+def _format_range(bounds: tuple[int, int]) -> str:
+    return f"{bounds[0]}-{bounds[1]}"
+
+def _write_text(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import inspect
+import itertools
+import logging
+import random
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Mapping
+
+from homeassistant.core import HomeAssistant
+from pymodbus.client import AsyncModbusSerialClient, AsyncModbusTcpClient
+from pymodbus.exceptions import ModbusIOException
+
+try:  # pymodbus >= 3.7
+    from pymodbus import FramerType as _Framer
+except ImportError:
+    from pymodbus import Framer as _Framer
+
+from .const import (
+    CONF_BAUDRATE,
+    CONF_BYTESIZE,
+    CONF_DEVICE,
+    CONF_FRAME_DELAY,
+    CONF_HOST,
+    CONF_PARITY,
+    CONF_PORT,
+    CONF_STOPBITS,
+    CONF_TRANSPORT,
+    CONNECT_BACKOFF_MAX,
+    CONNECT_BACKOFF_MIN,
+    DATA_CONNECTIONS,
+    DEFAULT_BAUDRATE,
+    DEFAULT_BYTESIZE,
+    DEFAULT_PARITY,
+    DEFAULT_PORT,
+    DEFAULT_STOPBITS,
+    MODBUS_RETRIES,
+    MODBUS_TIMEOUT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_WRITE,
+    TRANSPORT_DEFAULTS,
+    TRANSPORT_RTU_OVER_TCP,
+    TRANSPORT_SERIAL,
+    TRANSPORT_TCP,
+)
+
+if TYPE_CHECKING:
+    from .trace import BusTrace
+
+_LOGGER = logging.getLogger(__name__)
+
+# pymodbus 3.x calls the unit id "slave", newer releases "device_id".
+_UNIT_KWARG = (
+    "device_id"
+    if "device_id" in inspect.signature(AsyncModbusTcpClient.read_holding_registers).parameters
+    else "slave"
+)
+
+ModbusClient = AsyncModbusTcpClient | AsyncModbusSerialClient
+
+LINK_CONNECTED = "connected"
+LINK_DISCONNECTED = "disconnected"
+LINK_BACKOFF = "backoff"
+
+# Weight of the newest sample in the smoothed round-trip time.
+_LATENCY_ALPHA = 0.2
+
+
+class ModbusLinkError(Exception):
+    """The gateway is unreachable or the unit did not answer; the current poll should stop."""
+
+
+class ModbusTimeoutError(ModbusLinkError):
+    """The link is up, but the unit did not answer this request in time."""
+
+
+class ModbusConnection:
+    """Owns the Modbus client: one request at a time, fail-fast and reconnect backoff.
+
+    One instance per link (gateway host/port or serial port) is shared by
+    every unit id behind it (see :func:`async_acquire_connection`). Requests are queued by priority
+    (``PRIORITY_*``, lower first) and FIFO within a priority. The bus is
+    handed over after every single request, so a user write waits for at most
+    the one request in flight, and units polling at the same priority are
+    served round-robin.
+
+    Connect and transport failures back off the whole link. A unit that does
+    not answer (response timeout) only backs off itself, so one dead or
+    mistyped unit id does not take the other units on a shared gateway down.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        transport: str = TRANSPORT_TCP,
+        *,
+        baudrate: int = DEFAULT_BAUDRATE,
+        parity: str = DEFAULT_PARITY,
+        stopbits: int = DEFAULT_STOPBITS,
+        bytesize: int = DEFAULT_BYTESIZE,
+        frame_delay: float = 0.0,
+    ) -> None:
+        # For serial links ``host`` is the serial device and ``port`` is unused.
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self._serial = {"baudrate": baudrate, "parity": parity, "stopbits": stopbits, "bytesize": bytesize}
+        # Minimum bus silence between two frames (s); RS485 slaves need it to detect the frame end.
+        self.frame_delay = frame_delay
+        self._last_frame = 0.0
+        self.users = 0
+        self._client: ModbusClient | None = None
+        self._busy = False
+        # (priority, sequence, waiter) heap of requests waiting for the bus
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._retry_at = 0.0
+        self.failures = 0
+        self.requests = 0  # total requests put on the wire
+        self.last_error: str | None = None
+        self.latency: float | None = None  # smoothed round-trip time in seconds
+        # Units that timed out: consecutive timeouts / monotonic retry time / last error
+        self.unit_failures: dict[int, int] = {}
+        self._unit_retry_at: dict[int, float] = {}
+        self._unit_errors: dict[int, str] = {}
+        # Opt-in recorder of every request and answer (see trace.py).
+        self.trace: BusTrace | None = None
+
+    @property
+    def label(self) -> str:
+        return self.host if self.transport == TRANSPORT_SERIAL else f"{self.host}:{self.port}"
+
+    @property
+    def state(self) -> str:
+        """Current link health for diagnostics."""
+
+        if self._retry_at > time.monotonic():
+            return LINK_BACKOFF
+        if self._client is not None and self._client.connected and not self.failures:
+            return LINK_CONNECTED
+        return LINK_DISCONNECTED
+
+    @property
+    def queued(self) -> int:
+        """Requests currently waiting for the bus."""
+
+        return sum(1 for *_, waiter in self._queue if not waiter.done())
+
+    @contextlib.asynccontextmanager
+    async def _bus(self, priority: int) -> AsyncIterator[None]:
+        if self._busy or self._queue:
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Cancelled right after being handed the bus: pass it on.
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+        else:
+            self._busy = True
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._queue:
+            *_, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)  # hand over, the bus stays busy
+                return
+        self._busy = False
+
+    async def async_read(
+        self, reg_type: str, address: int, count: int, unit: int, priority: int = PRIORITY_BACKGROUND
+    ) -> list[int] | None:
+        """Read ``count`` words; ``None`` if the device answered with an exception."""
+
+        rr = await self.async_read_response(reg_type, address, count, unit, priority)
+        if rr.isError():
+            return None
+        return list(rr.registers)
+
+    async def async_read_response(
+        self, reg_type: str, address: int, count: int, unit: int, priority: int = PRIORITY_BACKGROUND
+    ) -> Any:
+        """Read ``count`` words and return the pymodbus response (``exception_code`` on errors)."""
+
+        async def _call(client: ModbusClient) -> Any:
+            if reg_type == "input":
+                return await client.read_input_registers(address=address, count=count, **{_UNIT_KWARG: unit})
+            return await client.read_holding_registers(address=address, count=count, **{_UNIT_KWARG: unit})
+
+        fc = 4 if reg_type == "input" else 3
+        return await self._async_request(_call, priority, {"u": unit, "fc": fc, "a": address, "n": count})
+
+    async def async_write(self, address: int, words: list[int], unit: int, priority: int = PRIORITY_WRITE) -> Any:
+        """Write holding registers (FC6 for one word, FC16 for several) and return the response."""
+
+        async def _call(client: ModbusClient) -> Any:
+            if len(words) == 1:
+                return await client.write_register(address=address, value=words[0], **{_UNIT_KWARG: unit})
+            return await client.write_registers(address=address, values=words, **{_UNIT_KWARG: unit})
+
+        fc = 6 if len(words) == 1 else 16
+        return await self._async_request(_call, priority, {"u": unit, "fc": fc, "a": address, "w": list(words)})
+
+    async def _async_request(
+        self, call: Callable[[ModbusClient], Awaitable[Any]], priority: int, request: Mapping[str, Any]
+    ) -> Any:
+        async with self._bus(priority):
+            unit = request["u"]
+            if self._retry_at > time.monotonic():
+                raise ModbusLinkError(f"{self.label} unavailable (retrying later: {self.last_error})")
+            if self._unit_retry_at.get(unit, 0.0) > time.monotonic():
+                raise ModbusLinkError(
+                    f"unit {unit} on {self.label} not answering (retrying later: {self._unit_errors.get(unit)})"
+                )
+
+            if self.frame_delay:
+                silence = self._last_frame + self.frame_delay - time.monotonic()
+                if silence > 0:
+                    await asyncio.sleep(silence)
+            start = time.monotonic()
+            try:
+                client = await self._async_connect()
+            except Exception as err:  # noqa: BLE001
+                self._last_frame = time.monotonic()
+                if self.trace is not None:
+                    self.trace.record(request, self._last_frame - start, error=err)
+                self._record_failure(err)
+                raise ModbusLinkError(str(err)) from err
+            try:
+                self.requests += 1
+                result = await call(client)
+            except Exception as err:  # noqa: BLE001
+                self._last_frame = time.monotonic()
+                if self.trace is not None:
+                    self.trace.record(request, self._last_frame - start, error=err)
+                if isinstance(err, (ModbusIOException, asyncio.TimeoutError)):
+                    # Connected, but this unit did not answer: the link stays up for the others.
+                    self._record_unit_failure(unit, err)
+                    raise ModbusTimeoutError(str(err)) from err
+                self._record_failure(err)
+                raise ModbusLinkError(str(err)) from err
+
+            self._last_frame = time.monotonic()
+            elapsed = self._last_frame - start
+            if self.trace is not None:
+                self.trace.record(request, elapsed, result)
+            self.latency = elapsed if self.latency is None else (
+                _LATENCY_ALPHA * elapsed + (1 - _LATENCY_ALPHA) * self.latency
+            )
+            self.failures = 0
+            self.last_error = None
+            if unit in self.unit_failures:
+                self._clear_unit(unit)
+            return result
+
+    async def _async_connect(self) -> ModbusClient:
+        if self._client is None:
+            # We back off ourselves; keep pymodbus from reconnecting in the background.
+            common = {"timeout": MODBUS_TIMEOUT, "retries": MODBUS_RETRIES, "reconnect_delay": 0}
+            if self.transport == TRANSPORT_SERIAL:
+                self._client = AsyncModbusSerialClient(
+                    port=self.host, framer=_Framer.RTU, **self._serial, **common
+                )
+            elif self.transport == TRANSPORT_RTU_OVER_TCP:
+                # Transparent RS485 bridge: RTU frames (with CRC) over a plain TCP stream.
+                self._client = AsyncModbusTcpClient(host=self.host, port=self.port, framer=_Framer.RTU, **common)
+            else:
+                self._client = AsyncModbusTcpClient(host=self.host, port=self.port, **common)
+        if not self._client.connected:
+            if not await self._client.connect():
+                raise ConnectionError(f"cannot connect to {self.label}")
+        return self._client
+
+    def reset_backoff(self, unit: int | None = None) -> None:
+        """Forget failures that were provoked on purpose (link probe) so polling starts immediately."""
+
+        self._retry_at = 0.0
+        self.failures = 0
+        self.last_error = None
+        if unit is not None:
+            self._clear_unit(unit)
+
+    def _clear_unit(self, unit: int) -> None:
+        self.unit_failures.pop(unit, None)
+        self._unit_retry_at.pop(unit, None)
+        self._unit_errors.pop(unit, None)
+
+    def _record_unit_failure(self, unit: int, err: Exception) -> None:
+        failures = self.unit_failures[unit] = self.unit_failures.get(unit, 0) + 1
+        self._unit_errors[unit] = str(err) or type(err).__name__
+        delay = _backoff(failures)
+        self._unit_retry_at[unit] = time.monotonic() + delay
+        _LOGGER.debug(
+            "Unit %s on %s did not answer (%s), retry in %.1fs", unit, self.label, self._unit_errors[unit], delay
+        )
+
+    def _record_failure(self, err: Exception) -> None:
+        self.failures += 1
+        self.last_error = str(err) or type(err).__name__
+        delay = _backoff(self.failures)
+        self._retry_at = time.monotonic() + delay
+        _LOGGER.debug("Modbus link %s failed (%s), retry in %.1fs", self.label, self.last_error, delay)
+        self._drop_client()
+
+    def _drop_client(self) -> None:
+        if self._client is not None:
+            with contextlib.suppress(Exception):
+                self._client.close()
+            self._client = None
+
+    async def async_close(self) -> None:
+        async with self._bus(PRIORITY_WRITE):
+            self._drop_client()
+
+
+def _backoff(failures: int) -> float:
+    delay = min(CONNECT_BACKOFF_MAX, CONNECT_BACKOFF_MIN * 2 ** (failures - 1))
+    # Jitter keeps several clients from hammering a recovering gateway in lockstep.
+    return delay * random.uniform(0.5, 1.0)
+
+
+def async_acquire_connection(
+    hass: HomeAssistant, host: str, port: int, transport: str = TRANSPORT_TCP, **options: Any
+) -> ModbusConnection:
+    """Return the shared connection for a link, creating it on first use.
+
+    ``options`` (serial settings, frame delay) only apply when the connection is created.
+    """
+
+    pool: dict[tuple[str, str, int], ModbusConnection] = hass.data.setdefault(DATA_CONNECTIONS, {})
+    key = (transport, host, port)
+    connection = pool.get(key)
+    if connection is None:
+        connection = pool[key] = ModbusConnection(host, port, transport, **options)
+    connection.users += 1
+    return connection
+
+
+def async_acquire_entry_connection(hass: HomeAssistant, config: Mapping[str, Any]) -> ModbusConnection:
+    """Shared connection for an entry's (merged) data and options, or a config flow's input."""
+
+    transport = config.get(CONF_TRANSPORT, TRANSPORT_TCP)
+    if transport == TRANSPORT_SERIAL:
+        # The serial device stands in for the host in the pool key.
+        host, port = str(config[CONF_DEVICE]), 0
+    else:
+        host, port = str(config[CONF_HOST]), int(config.get(CONF_PORT, DEFAULT_PORT))
+    frame_delay_ms = int(config.get(CONF_FRAME_DELAY, TRANSPORT_DEFAULTS[transport][0]))
+    return async_acquire_connection(
+        hass,
+        host,
+        port,
+        transport,
+        baudrate=int(config.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)),
+        parity=str(config.get(CONF_PARITY, DEFAULT_PARITY)),
+        stopbits=int(config.get(CONF_STOPBITS, DEFAULT_STOPBITS)),
+        bytesize=int(config.get(CONF_BYTESIZE, DEFAULT_BYTESIZE)),
+        frame_delay=frame_delay_ms / 1000,
+    )
+
+
+async def async_release_connection(hass: HomeAssistant, connection: ModbusConnection) -> None:
+    """Drop one user of a shared connection and close it when the last one is gone."""
+
+    connection.users -= 1
+    if connection.users > 0:
+        return
+    pool: dict[tuple[str, str, int], ModbusConnection] = hass.data.get(DATA_CONNECTIONS, {})
+    key = (connection.transport, connection.host, connection.port)
+    if pool.get(key) is connection:
+        del pool[key]
+    await connection.async_close()
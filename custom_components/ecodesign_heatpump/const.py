@@ -1,15 +1,150 @@
 DOMAIN = "ecodesign_heatpump"
 PLATFORMS = ["sensor","number","select","switch","climate"]
+# hass.data key of the per-link (gateway or serial port) Modbus connection pool
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
 
 CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_UNIT_ID = "unit_id"
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_MODEL = "model"
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_TRANSPORT = "transport"
+CONF_DEVICE = "device"
+CONF_BAUDRATE = "baudrate"
+CONF_PARITY = "parity"
+CONF_STOPBITS = "stopbits"
+CONF_BYTESIZE = "bytesize"
+CONF_FRAME_DELAY = "frame_delay"
+CONF_MAX_BLOCK_SIZE = "max_block_size"
+CONF_MAX_READ_GAP = "max_read_gap"
+CONF_LINK_LATENCY = "link_latency_ms"
+CONF_BUS_TRACE = "bus_trace"
 DEFAULT_PORT = 502
 DEFAULT_UNIT_ID = 3
 DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_MODEL = "ED300"
+DEFAULT_FAST_INTERVAL = 5
+DEFAULT_SLOW_INTERVAL = 300
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_BAUDRATE = 9600
+DEFAULT_PARITY = "N"
+DEFAULT_STOPBITS = 1
+DEFAULT_BYTESIZE = 8
+
+# Transports: Modbus TCP, RTU frames through a transparent RS485<->TCP bridge, serial RTU
+TRANSPORT_TCP = "tcp"
+TRANSPORT_RTU_OVER_TCP = "rtu_over_tcp"
+TRANSPORT_SERIAL = "serial"
+TRANSPORTS = (TRANSPORT_TCP, TRANSPORT_RTU_OVER_TCP, TRANSPORT_SERIAL)
+# Per transport: inter-frame delay (ms) / max words per request / unused addresses bridged.
+# On RS485 every request costs bus silence and turnaround, so fewer, larger blocks win.
+TRANSPORT_DEFAULTS: dict[str, tuple[int, int, int]] = {
+    TRANSPORT_TCP: (0, 32, 8),
+    TRANSPORT_RTU_OVER_TCP: (20, 64, 16),
+    TRANSPORT_SERIAL: (20, 64, 16),
+}
+
+# Poll classes a register (or a whole profile category) can be assigned to.
+# "normal" follows the scan interval, "once" is only read at startup and after writes.
+POLL_FAST = "fast"
+POLL_NORMAL = "normal"
+POLL_SLOW = "slow"
+POLL_ONCE = "once"
+POLL_CLASSES = (POLL_FAST, POLL_NORMAL, POLL_SLOW, POLL_ONCE)
+
+# Read planner: unused addresses bridged inside a block / max words per request
+DEFAULT_MAX_READ_GAP = 8
+DEFAULT_MAX_BLOCK_SIZE = 32
+# Modbus limit for FC16 (write multiple registers); reads allow 125
+MAX_WRITE_BLOCK_SIZE = 123
+
+# Link probe (config/options flow): one-register round trips timed / block sizes tried, ascending
+PROBE_PINGS = 5
+PROBE_BLOCK_SIZES = (16, 32, 64, 125)
+
+# Modbus link: per-request timeout (s), retries, reconnect backoff bounds (s)
+MODBUS_TIMEOUT = 6
+MODBUS_RETRIES = 1
+CONNECT_BACKOFF_MIN = 2.0
+CONNECT_BACKOFF_MAX = 300.0
+
+# Bus trace (opt-in, options): file size (bytes) before rotating / rotated files kept;
+# buffered records are written every TRACE_FLUSH_LINES records or TRACE_FLUSH_INTERVAL seconds
+DEFAULT_BUS_TRACE = False
+TRACE_MAX_BYTES = 5_000_000
+TRACE_BACKUPS = 3
+TRACE_FLUSH_LINES = 200
+TRACE_FLUSH_INTERVAL = 10.0
+
+# Request priorities on the shared bus, lower is served first: user writes, write
+# read-backs, fast-tier reads, everything else (normal/slow/once tiers)
+PRIORITY_WRITE = 0
+PRIORITY_CONFIRM = 1
+PRIORITY_FAST = 2
+PRIORITY_BACKGROUND = 3
+
+# Adaptive polling: back off above this mean request latency (s) / failed share,
+# up to this interval multiplier; burst interval/duration (s) after writes or relay changes
+ADAPTIVE_MAX_LATENCY = 0.5
+ADAPTIVE_MAX_ERROR_RATE = 0.1
+ADAPTIVE_MAX_FACTOR = 8.0
+ADAPTIVE_BURST_INTERVAL = 2.0
+ADAPTIVE_BURST_DURATION = 60.0
+
+# Writes within this window (s) are confirmed by one merged read-back
+WRITE_VERIFY_COOLDOWN = 1.0
+# Write guard defaults: min. seconds between writes to one address (0 = off) / writes per address and day
+DEFAULT_MIN_WRITE_INTERVAL = 0.0
+DEFAULT_DAILY_WRITE_BUDGET = 200
+
+# PV-surplus controller (options): grid power sensor, sign, smoothing window (s), hysteresis (W),
+# nominal draw of compressor / heating rod (W), min. seconds between mode changes
+CONF_PV_GRID_ENTITY = "pv_grid_entity"
+CONF_PV_EXPORT_POSITIVE = "pv_export_positive"
+CONF_PV_WINDOW = "pv_window"
+CONF_PV_HYSTERESIS = "pv_hysteresis"
+CONF_PV_WP_POWER = "pv_wp_power"
+CONF_PV_EL_POWER = "pv_el_power"
+CONF_PV_MIN_SWITCH_INTERVAL = "pv_min_switch_interval"
+DEFAULT_PV_EXPORT_POSITIVE = False
+DEFAULT_PV_WINDOW = 120
+DEFAULT_PV_HYSTERESIS = 300
+DEFAULT_PV_WP_POWER = 600
+DEFAULT_PV_EL_POWER = 2000
+DEFAULT_PV_MIN_SWITCH_INTERVAL = 300
+
+# High-rate sampling (options): sensor keys, sample interval (s), entity publish interval (s);
+# samples become hourly min/max/mean in the long-term statistics
+CONF_SAMPLE_KEYS = "sampling_keys"
+CONF_SAMPLE_INTERVAL = "sampling_interval"
+CONF_SAMPLE_PUBLISH_INTERVAL = "sampling_publish_interval"
+DEFAULT_SAMPLE_INTERVAL = 2
+DEFAULT_SAMPLE_PUBLISH_INTERVAL = 60
+
+# Slider/thermostat writes: quiet time (s) before the newest value is sent / max. hold (s)
+WRITE_SETTLE_DELAY = 1.0
+WRITE_SETTLE_MAX = 5.0
+
+# Persisted snapshot of the last decoded data: storage version / save delay (s)
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60.0
+
+# Sample history: default ring size per register; gaps (s) longer than this are not counted as runtime
+DEFAULT_HISTORY_SAMPLES = 720
+HISTORY_MAX_GAP = 600.0
+
+# Register discovery (options flow): form fields
+CONF_INPUT_RANGE = "input_range"
+CONF_HOLDING_RANGE = "holding_range"
+CONF_DISCOVERY_SAMPLES = "samples"
+CONF_DISCOVERY_INTERVAL = "sample_interval"
+
+SERVICE_WRITE_REGISTERS = "write_registers"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_VALUES = "values"
 
 ATTR_DEVICE_MANUFACTURER = "EcoDesign"
 ATTR_DEVICE_MODEL = "ED 300 WT"
@@ -1,219 +1,622 @@
 from __future__ import annotations
 
-import contextlib
-import json
+import asyncio
 import logging
-from dataclasses import dataclass
+import time
 from datetime import timedelta
-from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Iterable, Mapping
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from pymodbus.client import AsyncModbusTcpClient
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from pymodbus.exceptions import ModbusException
 
+from .adaptive import AdaptivePolling
+from .coalescer import WriteCoalescer
+from .guard import WriteGuard
+from .pv_controller import PVSurplusController
+from .connection import ModbusLinkError, async_acquire_entry_connection, async_release_connection
 from .const import (
-    CONF_HOST,
-    CONF_MODEL,
-    CONF_PORT,
+    CONF_ADAPTIVE_POLLING,
+    CONF_BUS_TRACE,
+    CONF_FAST_INTERVAL,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_READ_GAP,
+    CONF_PV_GRID_ENTITY,
+    CONF_SAMPLE_INTERVAL,
+    CONF_SAMPLE_KEYS,
+    CONF_SAMPLE_PUBLISH_INTERVAL,
     CONF_SCAN_INTERVAL,
+    CONF_SLOW_INTERVAL,
     CONF_UNIT_ID,
-    DEFAULT_MODEL,
-    DEFAULT_PORT,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_BUS_TRACE,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLE_PUBLISH_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
     DEFAULT_UNIT_ID,
+    DOMAIN,
+    MAX_WRITE_BLOCK_SIZE,
+    POLL_FAST,
+    POLL_NORMAL,
+    POLL_ONCE,
+    POLL_SLOW,
+    PRIORITY_BACKGROUND,
+    PRIORITY_CONFIRM,
+    PRIORITY_FAST,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+    TRANSPORT_DEFAULTS,
+    WRITE_VERIFY_COOLDOWN,
 )
+from .history import History
+from .profile import CompiledProfile, ReadBlock, RegisterDef
+from .sampler import HighRateSampler
+from .stats import PollStats
+from .trace import async_attach_trace, async_detach_trace
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass(slots=True)
-class RegisterDef:
-    """Light-weight description of a single Modbus register."""
-
-    key: str
-    name: str
-    reg_type: str
-    address: int
-    scale: float | None = None
-    unit: str | None = None
-    min_value: float | None = None
-    max_value: float | None = None
-    step: float | None = None
-    options: list[tuple[str, int]] | None = None
-
-    @classmethod
-    def from_dict(cls, data: dict[str, Any]) -> RegisterDef:
-        """Create a :class:`RegisterDef` from the JSON profile description."""
-
-        raw_options = data.get("options") or []
-        options: list[tuple[str, int]] | None
-        if raw_options:
-            options = [(str(label), int(code)) for label, code in raw_options]
-        else:
-            options = None
+def build_write_plan(
+    values: Mapping[int, int], max_count: int = DEFAULT_MAX_BLOCK_SIZE
+) -> list[tuple[int, list[int]]]:
+    """Coalesce ``address -> word`` writes into runs of adjacent addresses."""
 
-        def _to_float(value: Any | None) -> float | None:
-            return float(value) if value is not None else None
+    max_count = min(max_count, MAX_WRITE_BLOCK_SIZE)
+    runs: list[tuple[int, list[int]]] = []
+    for address in sorted(values):
+        if runs:
+            start, words = runs[-1]
+            if address == start + len(words) and len(words) < max_count:
+                words.append(values[address])
+                continue
+        runs.append((address, [values[address]]))
+    return runs
 
-        scale = data.get("scale")
-        if scale is not None:
-            try:
-                scale = float(scale)
-            except (TypeError, ValueError):  # pragma: no cover - defensive
-                scale = None
-
-        return cls(
-            key=str(data["key"]),
-            name=str(data.get("name", data["key"])),
-            reg_type=str(data.get("register_type", "holding")),
-            address=int(data["address"]),
-            scale=scale,
-            unit=data.get("unit"),
-            min_value=_to_float(data.get("min")),
-            max_value=_to_float(data.get("max")),
-            step=_to_float(data.get("step")),
-            options=options,
-        )
+
+def _gap_free_runs(block: ReadBlock) -> list[tuple[int, int]]:
+    """``(word index, count)`` runs of a block's fields without the bridged gaps between them."""
+
+    runs: list[tuple[int, int]] = []
+    for index, width, _regs in block.fields:
+        if runs and runs[-1][0] + runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], runs[-1][1] + width)
+        else:
+            runs.append((index, width))
+    return runs
 
 
 class ED300Coordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Central Modbus coordinator for the EcoDesign ED300 device."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, profile: CompiledProfile) -> None:
         self.hass = hass
         self.entry = entry
 
         config: dict[str, Any] = {**entry.data, **(entry.options or {})}
-        self.host: str = config.get(CONF_HOST) or entry.data[CONF_HOST]
-        self.port: int = int(config.get(CONF_PORT, DEFAULT_PORT))
+        # Shared with every other unit on the same link.
+        self.connection = async_acquire_entry_connection(hass, config)
+        # For serial links the device stands in for the host (entity ids, logs).
+        self.transport: str = self.connection.transport
+        # Opt-in bus recording; one file per link, shared by its units.
+        self._tracing = bool(config.get(CONF_BUS_TRACE, DEFAULT_BUS_TRACE))
+        if self._tracing:
+            async_attach_trace(hass, self.connection)
+        self.host: str = self.connection.host
+        self.port: int = self.connection.port
+        _, max_block_size, max_gap = TRANSPORT_DEFAULTS[self.transport]
+        # Measured by the link probe (config/options flow) or set in the options.
+        self.max_block_size: int = int(config.get(CONF_MAX_BLOCK_SIZE, max_block_size))
+        self.max_read_gap: int = min(int(config.get(CONF_MAX_READ_GAP, max_gap)), self.max_block_size)
         self.unit_id: int = int(config.get(CONF_UNIT_ID, DEFAULT_UNIT_ID))
-        self.model: str = str(config.get(CONF_MODEL, DEFAULT_MODEL))
         scan_interval = int(config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL))
-
-        profile = self._load_profile(self.model)
-        device = profile.get("device", {})
-        self.device: dict[str, Any] = {
-            "manufacturer": device.get("manufacturer"),
-            "model": device.get("model"),
+        self.poll_intervals: dict[str, float | None] = {
+            POLL_FAST: float(config.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL)),
+            POLL_NORMAL: float(scan_interval),
+            POLL_SLOW: float(config.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL)),
+            POLL_ONCE: None,
         }
 
-        self.registers: dict[str, Any] = {}
-        raw_registers: dict[str, Any] = profile.get("registers", {})
-        for category in ("sensors", "numbers", "selects", "switches"):
-            items = raw_registers.get(category, [])
-            self.registers[category] = [RegisterDef.from_dict(item) for item in items]
-        if "climate" in raw_registers:
-            self.registers["climate"] = raw_registers["climate"]
+        # Compiled once per profile version and shared by every coordinator of this model.
+        self.profile = profile
+        self.model: str = profile.model
+        self.device: dict[str, Any] = profile.device
+        self.registers: dict[str, Any] = profile.registers
+
+        self.read_requests = 0
+        self.stats = PollStats()
+        # (reg_type, address) -> every register sharing that word; used to fan out
+        # decoded reads as well as optimistic write-back.
+        self._registers_by_slot = profile.registers_by_slot
+        self._writable_by_key = profile.writable_by_key
+        # Block limits follow the transport (or the probe): slow RTU links get fewer, larger requests.
+        self._read_plan = profile.read_plan(self.max_read_gap, self.max_block_size)
+        # monotonic time at which each block is next due; 0 = read on the first refresh
+        self._block_due: list[float] = [0.0] * len(self._read_plan)
+        # Blocks the device rejected as a whole -> the (word index, count) reads that work instead
+        self._block_runs: dict[tuple[str, int, int], list[tuple[int, int]]] = {}
+        tick = min(
+            (self.poll_intervals[block.poll] or scan_interval for block in self._read_plan),
+            default=scan_interval,
+        )
+        self._base_tick = float(tick)
+        self.adaptive = AdaptivePolling(bool(config.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)))
+        self._burst_keys = profile.burst_keys
+        # Recent samples of every sensor register and the runtime/rate statistics derived from them.
+        self.history = History(profile.history, (reg.key for reg in profile.iter_registers(("sensors",))))
+        self._pending_verify: set[tuple[str, int]] = set()
+        # Pending read-back timer. Unlike a Debouncer, writes arriving while a
+        # read-back is in flight arm a new timer instead of being dropped.
+        self._verify_unsub: CALLBACK_TYPE | None = None
+        # Slider/thermostat values: only the newest per register reaches the bus.
+        self.coalescer = WriteCoalescer(hass, self._async_write_raw)
+        # Skips unchanged values, enforces per-register intervals and the daily budget. A read
+        # confirms a holding word until its block is due again (plus one tick of scheduling lag).
+        slow_interval = self.poll_intervals[POLL_SLOW]
+        confirm_age = {
+            block.address + offset: (self.poll_intervals[block.poll] or slow_interval) + self._base_tick
+            for block in self._read_plan
+            if block.reg_type == "holding"
+            for offset in range(block.count)
+        }
+        self.guard = WriteGuard(
+            profile.write_limits, profile.default_write_limits, confirm_age, slow_interval + self._base_tick
+        )
+        # Last decoded data, persisted so entities start with values after a restart.
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._save_pending = False
 
-        self._client: AsyncModbusTcpClient | None = None
-        self._registers_by_address: dict[int, list[RegisterDef]] = {}
-        for reg in self._iter_all_registers(("sensors", "numbers", "selects", "switches")):
-            self._registers_by_address.setdefault(reg.address, []).append(reg)
+        # Keys whose value differs from the snapshot last pushed to listeners;
+        # None until the first snapshot exists (= everything changed).
+        self.changed_keys: set[str] | None = None
+        self._notified: dict[str, Any] | None = None
 
         super().__init__(
             hass,
             _LOGGER,
-            name=f"EcoDesign ED300 ({self.host})",
-            update_interval=timedelta(seconds=scan_interval),
+            name=f"EcoDesign ED300 ({self.host}/{self.unit_id})",
+            update_interval=timedelta(seconds=tick),
+        )
+
+        # Optional high-rate sampling (started by async_setup_entry): its blocks are decoded from
+        # the newest sample instead of being read by the poll; the sampled keys themselves are
+        # only published every publish interval.
+        sampler = HighRateSampler(
+            hass,
+            f"EcoDesign ED300 {self.unit_id}",
+            f"{self.host}_{self.unit_id}",
+            self._read_plan,
+            config.get(CONF_SAMPLE_KEYS) or (),
+            lambda block: self._read_block(block, PRIORITY_FAST),
+            self._decode_block,
+            float(config.get(CONF_SAMPLE_INTERVAL, DEFAULT_SAMPLE_INTERVAL)),
+            float(config.get(CONF_SAMPLE_PUBLISH_INTERVAL, DEFAULT_SAMPLE_PUBLISH_INTERVAL)),
+        )
+        self.sampler: HighRateSampler | None = sampler if sampler.blocks else None
+        self._sample_publish_due = 0.0  # monotonic
+
+        # Started by async_setup_entry; decides from the cached relay and mode values.
+        self.pv_controller: PVSurplusController | None = (
+            PVSurplusController(hass, self, config) if config.get(CONF_PV_GRID_ENTITY) and profile.pv else None
         )
 
-    def _iter_all_registers(self, categories: Iterable[str]) -> Iterable[RegisterDef]:
-        for category in categories:
-            for reg in self.registers.get(category, []):
-                yield reg
+    @callback
+    def async_update_listeners(self) -> None:
+        """Diff the data against the last notified snapshot before waking entities."""
+
+        data = self.data or {}
+        if self._notified is None:
+            self.changed_keys = None
+        else:
+            previous = self._notified
+            self.changed_keys = {
+                key for key in data.keys() | previous.keys() if data.get(key) != previous.get(key)
+            }
+        self._notified = dict(data)
+        super().async_update_listeners()
+
+    async def async_restore_snapshot(self) -> bool:
+        """Seed ``data`` with the persisted snapshot; returns whether there was one.
+
+        Listeners are not notified – entities pick the values up when they are added.
+        """
+
+        stored = await self._store.async_load()
+        if not stored or stored.get("model") != self.model or not isinstance(stored.get("data"), dict):
+            return False
+        self.data = stored["data"]
+        self.history.restore(stored.get("history") or {})
+        self.guard.restore(stored.get("writes") or {})
+        if self.sampler is not None:
+            self.sampler.restore(stored.get("sampling") or {})
+        _LOGGER.debug("Restored %s values for %s", len(self.data), self.name)
+        return True
+
+    @callback
+    def _snapshot(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "data": self.data,
+            "history": self.history.as_state(),
+            "writes": self.guard.as_state(),
+            "sampling": self.sampler.as_state() if self.sampler is not None else {},
+        }
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Save the snapshot at most once per ``SNAPSHOT_SAVE_DELAY``.
+
+        ``Store.async_delay_save`` restarts its timer on every call, so calling it
+        on each 5 s poll would postpone the save until shutdown. Only arm it when
+        no save is pending; the Store still writes a pending save on shutdown.
+        """
 
-    def _load_profile(self, model: str) -> dict[str, Any]:
-        """Load the integration profile for the configured model."""
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._pending_snapshot, SNAPSHOT_SAVE_DELAY)
 
-        filename = f"{model.lower()}.json"
-        profile_path = Path(__file__).resolve().parent / "profiles" / filename
-        if not profile_path.exists():
-            raise FileNotFoundError(f"Unknown EcoDesign profile '{model}' ({profile_path})")
+    @callback
+    def _pending_snapshot(self) -> dict[str, Any]:
+        self._save_pending = False
+        return self._snapshot()
 
-        with profile_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+    @property
+    def read_plan(self) -> list[ReadBlock]:
+        return self._read_plan
 
     async def async_write_register(self, address: int, value: int) -> None:
         """Write a Modbus holding register and update cached coordinator data."""
 
-        await self._ensure_client()
-        assert self._client is not None  # for mypy/static linters
+        self.coalescer.discard([address])
+        await self._async_write_raw({address: value})
 
-        _LOGGER.debug("Writing register @%s = %s (unit=%s)", address, value, self.unit_id)
-        result = await self._client.write_register(address=address, value=value, unit=self.unit_id)
-        if result.isError():
-            raise ModbusException(str(result))
+    async def async_write_registers(self, values: Mapping[str, Any]) -> None:
+        """Write several registers by key, coalescing adjacent addresses into FC16 requests."""
 
-        if self.data is None:
-            current: dict[str, Any] = {}
-        else:
-            current = dict(self.data)
-
-        for reg in self._registers_by_address.get(address, []):
-            new_value: Any = value
-            if reg.scale:
-                try:
-                    new_value = value * reg.scale
-                except TypeError:  # pragma: no cover - defensive
-                    new_value = value
-            current[reg.key] = new_value
+        raw = {
+            address + offset: word
+            for address, words in self._encode(values).items()
+            for offset, word in enumerate(words)
+        }
+        if not raw:
+            return
+        # A direct write supersedes slider values still settling for the same registers.
+        self.coalescer.discard(raw)
+        await self._async_write_raw(raw)
+
+    async def async_write_coalesced(self, values: Mapping[str, Any]) -> None:
+        """Write interactively changed registers last-write-wins (see :class:`WriteCoalescer`).
+
+        The value shows up in the entity state immediately; the call returns once
+        the register's final value has been written and raises that write's error.
+        """
+
+        encoded = self._encode(values)
+        waiters = [self.coalescer.submit(address, words) for address, words in encoded.items()]
+        current: dict[str, Any] = dict(self.data or {})
+        self._decode_written(current, self.coalescer.pending_words())
+        self.async_set_updated_data(current)
+        try:
+            await asyncio.gather(*waiters)
+        except Exception:
+            self._revert_optimistic(
+                address + offset for address, words in encoded.items() for offset in range(len(words))
+            )
+            raise
+
+    @callback
+    def _revert_optimistic(self, addresses: Iterable[int]) -> None:
+        """Undo optimistic values whose write failed: back to the device's words, or re-read them."""
+
+        pending = self.coalescer.pending_words()
+        # A newer value still settling for the same register keeps its own optimistic state.
+        failed = [address for address in addresses if address not in pending]
+        known = {address: self.guard.confirmed[address] for address in failed if address in self.guard.confirmed}
+        current: dict[str, Any] = dict(self.data or {})
+        self._decode_written(current, known)
+        if current != self.data:
+            self.async_set_updated_data(current)
+        unknown = [address for address in failed if address not in known]
+        if unknown:
+            self._pending_verify.update(("holding", address) for address in unknown)
+            if self._verify_unsub is None:
+                self._verify_unsub = async_call_later(self.hass, WRITE_VERIFY_COOLDOWN, self._async_verify_writes)
+
+    def _encode(self, values: Mapping[str, Any]) -> dict[int, list[int]]:
+        """Register start address -> encoded words; validates against the profile."""
+
+        encoded: dict[int, list[int]] = {}
+        for key, value in values.items():
+            reg = self._writable_by_key.get(key)
+            if reg is None:
+                raise ServiceValidationError(f"Unknown or read-only register '{key}'")
+            try:
+                encoded[reg.address] = reg.encode(value)
+            except ValueError as err:
+                raise ServiceValidationError(str(err)) from err
+        return encoded
+
+    async def _async_write_raw(self, raw: Mapping[int, int]) -> None:
+        """Write holding words through the write guard (raises HomeAssistantError if it refuses)."""
+
+        changed = self.guard.check(raw)
+        for address, words in build_write_plan(changed, self.max_block_size):
+            _LOGGER.debug("Writing registers @%s = %s (unit=%s)", address, words, self.unit_id)
+            result = await self.connection.async_write(address, words, self.unit_id)
+            if result.isError():
+                raise ModbusException(str(result))
+            self.guard.record(dict(zip(range(address, address + len(words)), words)))
+
+        if changed:
+            await self._async_apply_written(changed)
+            self._schedule_save()
+        if len(changed) < len(raw):
+            # Skipped as unchanged: the entity may still show a superseded optimistic value.
+            _LOGGER.debug("Skipped unchanged registers %s (unit=%s)", sorted(raw.keys() - changed.keys()), self.unit_id)
+            current: dict[str, Any] = dict(self.data or {})
+            self._decode_written(current, raw)
+            if current != self.data:
+                self.async_set_updated_data(current)
+
+    def _decode_written(self, data: dict[str, Any], written: Mapping[int, int]) -> None:
+        """Decode holding words into ``data``; input registers at the same address stay untouched."""
+
+        for address in written:
+            regs = self._registers_by_slot.get(("holding", address))
+            if regs:
+                words = [written.get(address + offset) for offset in range(regs[0].words)]
+                if None not in words:
+                    self._decode_into(data, regs, self._join(words, 0, len(words)))
+
+    async def _async_apply_written(self, written: Mapping[int, int]) -> None:
+        """Apply written holding words optimistically and schedule their read-back."""
+
+        self.adaptive.trigger_burst()
+        self._apply_adaptive_interval()
+
+        current: dict[str, Any] = dict(self.data or {})
+        self._decode_written(current, written)
+        self._pending_verify.update(("holding", address) for address in written)
 
         if current:
             self.async_set_updated_data(current)
 
-        await self.async_request_refresh()
-
-    async def _ensure_client(self) -> None:
-        if self._client is None:
-            self._client = AsyncModbusTcpClient(host=self.host, port=self.port, timeout=6)
-        if not self._client.connected:
-            await self._client.connect()
+        # Confirm just the written blocks; a burst of writes shares one read-back.
+        if self._verify_unsub is None:
+            self._verify_unsub = async_call_later(self.hass, WRITE_VERIFY_COOLDOWN, self._async_verify_writes)
+
+    async def _async_verify_writes(self, _now: Any = None) -> None:
+        """Re-read the blocks touched by recent writes and merge them into the data."""
+
+        self._verify_unsub = None
+        slots, self._pending_verify = self._pending_verify, set()
+        blocks = [
+            block
+            for block in self._read_plan
+            if any((block.reg_type, address) in slots for address in block.addresses)
+        ]
+        if not blocks:
+            return
+
+        data: dict[str, Any] = dict(self.data or {})
+        try:
+            for block in blocks:
+                self._apply_block(block, await self._read_block(block, PRIORITY_CONFIRM), data)
+        except Exception as err:  # noqa: BLE001
+            # The next regular poll reconciles whatever we could not confirm.
+            _LOGGER.debug("Write read-back failed: %s", err)
+            return
+        # Values still settling stay optimistic until they are written.
+        self._decode_written(data, self.coalescer.pending_words())
+        self.async_set_updated_data(data)
+
+    async def _read_words(self, reg_type: str, address: int, count: int, priority: int) -> list[int] | None:
+        # Counted here rather than on the shared connection, which serves other units too.
+        self.read_requests += 1
+        return await self.connection.async_read(reg_type, address, count, self.unit_id, priority)
+
+    async def _read_block(self, block: ReadBlock, priority: int) -> list[int | None]:
+        """Read a planned block; if it is rejected, read its gap-free runs (and remember that).
+
+        Returns one entry per word of the block; ``None`` marks words that could not be read.
+        """
+
+        key = (block.reg_type, block.address, block.count)
+        runs = self._block_runs.get(key)
+        if runs is None:
+            words = await self._read_words(block.reg_type, block.address, block.count, priority)
+            if words is not None and len(words) >= block.count:
+                return words
+            # Some firmwares reject blocks spanning unmapped addresses. Read the gap-free runs
+            # of the block instead, from now on without trying the whole block first.
+            runs = _gap_free_runs(block)
+            _LOGGER.debug(
+                "Block read %s @%s+%s rejected, reading it as %s from now on",
+                block.reg_type,
+                block.address,
+                block.count,
+                [f"@{block.address + index}+{count}" for index, count in runs],
+            )
+
+        values: list[int | None] = [None] * block.count
+        learned: list[tuple[int, int]] = []
+        for index, count in runs:
+            words = await self._read_words(block.reg_type, block.address + index, count, priority)
+            if words is not None and len(words) >= count:
+                values[index : index + count] = words[:count]
+                learned.append((index, count))
+                continue
+            singles = [(start, width) for start, width, _regs in block.fields if index <= start < index + count]
+            if len(singles) == 1:
+                _LOGGER.debug("Read failed for %s @%s: exception response", block.reg_type, block.address + index)
+                learned.append((index, count))
+                continue
+            # A rejected run is read value by value, now and in later polls.
+            for start, width in singles:
+                single = await self._read_words(block.reg_type, block.address + start, width, priority)
+                if single is not None and len(single) >= width:
+                    values[start : start + width] = single[:width]
+                else:
+                    _LOGGER.debug("Read failed for %s @%s: exception response", block.reg_type, block.address + start)
+            learned.extend(singles)
+        self._block_runs[key] = learned
+        return values
+
+    @staticmethod
+    def _join(words: list[int | None], index: int, width: int) -> int | None:
+        """Raw value of ``width`` words starting at ``index`` (high word first), None if any is missing."""
+
+        raw = words[index]
+        if width == 1 or raw is None:
+            return raw
+        for word in words[index + 1 : index + width]:
+            if word is None:
+                return None
+            raw = raw << 16 | word
+        return raw
+
+    @staticmethod
+    def _decode_into(data: dict[str, Any], regs: Iterable[RegisterDef], raw: int) -> None:
+        for reg in regs:
+            data[reg.key] = reg.decode(raw)
+            for bit_key, mask in reg.bit_keys:
+                data[bit_key] = bool(raw & mask)
+
+    def _apply_block(
+        self, block: ReadBlock, words: list[int | None], data: dict[str, Any], skip: frozenset[str] = frozenset()
+    ) -> tuple[int, int]:
+        """Decode a block in one pass over its decode table; returns (ok, failed) value counts.
+
+        Fields holding a key in ``skip`` keep their previous value.
+        """
+
+        ok = failed = 0
+        for index, width, regs in block.fields:
+            if skip and any(reg.key in skip for reg in regs):
+                continue
+            raw = self._join(words, index, width)
+            if raw is None:
+                failed += 1
+                self.stats.record_errors(reg.key for reg in regs)
+                continue
+            self._decode_into(data, regs, raw)
+            if block.reg_type == "holding":
+                for offset in range(width):
+                    self.guard.observe(block.address + index + offset, words[index + offset])
+            ok += 1
+        return ok, failed
+
+    def _decode_block(self, block: ReadBlock, words: list[int | None]) -> dict[str, Any]:
+        values: dict[str, Any] = {}
+        self._apply_block(block, words, values)
+        return values
 
     async def _async_update_data(self) -> dict[str, Any]:
-        await self._ensure_client()
-        data: dict[str, Any] = {}
+        # Blocks that are not due keep their previous values.
+        data: dict[str, Any] = dict(self.data or {})
         ok_reads = 0
         errors = 0
 
-        async def _read(reg) -> int | None:
+        now = time.monotonic()
+        # Half a tick of slack so timer jitter does not push a block to the next tick.
+        slack = self.update_interval.total_seconds() / 2 if self.update_interval else 0.0
+        bursting = self.adaptive.bursting
+        sampled = self.sampler.blocks if self.sampler is not None else {}
+        publish = bool(sampled) and self._sample_publish_due <= now + slack
+        due = [
+            index
+            for index, next_due in enumerate(self._block_due)
+            if next_due <= now + slack
+            or (bursting and self._read_plan[index].poll == POLL_FAST)
+            or (publish and index in sampled)
+        ]
+        bus_time = 0.0
+        read_blocks = 0
+        requests_before = self.read_requests
+        for index in due:
+            block = self._read_plan[index]
+            interval = self.poll_intervals[block.poll]
+            self._block_due[index] = now + self.adaptive.scale(interval) if interval is not None else float("inf")
+            words = self.sampler.words(index) if index in sampled else None
+            if words is not None:
+                # Sampled at a high rate in between: decode the newest sample, no request.
+                # The sampled keys themselves only change every publish interval.
+                ok, failed = self._apply_block(block, words, data, frozenset() if publish else self.sampler.key_set)
+                ok_reads += ok
+                errors += failed
+                continue
+            started = time.monotonic()
             try:
-                if reg.reg_type == "input":
-                    rr = await self._client.read_input_registers(address=reg.address, count=1, unit=self.unit_id)
-                else:
-                    rr = await self._client.read_holding_registers(address=reg.address, count=1, unit=self.unit_id)
-                if rr.isError():
-                    raise ModbusException(str(rr))
-                return rr.registers[0]
-            except Exception as err:  # noqa: BLE001
-                _LOGGER.debug("Read failed for %s @%s: %s", reg.key, reg.address, err)
-                return None
-
-        # read sensors/numbers/selects/switches gracefully
-        for category in ("sensors", "numbers", "selects", "switches"):
-            for r in self.registers.get(category, []):
-                val = await _read(r)
-                if val is None:
-                    errors += 1
-                    continue
-                if getattr(r, "scale", None):
-                    try:
-                        val = val * r.scale  # type: ignore[operator]
-                    except Exception:
-                        pass
-                data[r.key] = val
-                ok_reads += 1
-
-        if ok_reads == 0:
+                # Every request queues separately, so writes and read-backs overtake the sweep.
+                words = await self._read_block(block, PRIORITY_FAST if block.poll == POLL_FAST else PRIORITY_BACKGROUND)
+            except ModbusLinkError as err:
+                # Gateway down: fail the whole poll now instead of timing out block by block.
+                for pending in due:
+                    if pending >= index:
+                        self._block_due[pending] = 0.0
+                self.adaptive.record_poll(None, 1.0)
+                self._apply_adaptive_interval()
+                self.stats.record_poll(time.monotonic() - now, self.read_requests - requests_before, False)
+                raise UpdateFailed(f"Modbus link {self.connection.label} failed: {err}") from err
+            elapsed = time.monotonic() - started
+            bus_time += elapsed
+            read_blocks += 1
+            self.stats.record_block(f"{block.reg_type}@{block.address}+{block.count}", elapsed)
+
+            ok, failed = self._apply_block(block, words, data)
+            ok_reads += ok
+            errors += failed
+
+        if publish:
+            self._sample_publish_due = now + self.sampler.publish_interval
+        if due and len(self.coalescer):
+            # Values still settling stay optimistic until they are written.
+            self._decode_written(data, self.coalescer.pending_words())
+        if ok_reads:
+            data.update(self.history.record(now, data))
+
+        if due:
+            self.stats.record_poll(
+                time.monotonic() - now, self.read_requests - requests_before, ok_reads > 0
+            )
+            if read_blocks:
+                self.adaptive.record_poll(bus_time / read_blocks, errors / max(1, ok_reads + errors))
+            previous = self.data or {}
+            if any(key in previous and previous[key] != data.get(key) for key in self._burst_keys):
+                self.adaptive.trigger_burst()
+            self._apply_adaptive_interval()
+
+        if ok_reads:
+            # At most one write per SNAPSHOT_SAVE_DELAY, flushed on shutdown by the Store.
+            self._schedule_save()
+
+        if due and ok_reads == 0:
             # Keine brauchbaren Daten – aber: NICHT crashen, leer zurückgeben.
             _LOGGER.warning("No registers could be read (host=%s port=%s unit=%s)", self.host, self.port, self.unit_id)
 
         return data
 
+    def _apply_adaptive_interval(self) -> None:
+        if self.adaptive.enabled:
+            self.update_interval = timedelta(seconds=self.adaptive.tick(self._base_tick))
+
     async def async_close(self) -> None:
-        if self._client is not None:
-            with contextlib.suppress(Exception):
-                await self._client.close()
-            self._client = None
+        try:
+            await self.coalescer.async_flush()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Pending setpoint writes for %s failed on unload: %s", self.name, err)
+        if self._verify_unsub is not None:
+            self._verify_unsub()
+            self._verify_unsub = None
+        if self.data:
+            await self._store.async_save(self._snapshot())
+        if self._tracing:
+            await async_detach_trace(self.connection)
+        await async_release_connection(self.hass, self.connection)
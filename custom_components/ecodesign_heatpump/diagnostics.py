@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_HOST, DOMAIN
+from .coordinator import ED300Coordinator
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return poll/bus statistics and the current register snapshot."""
+
+    coordinator: ED300Coordinator = hass.data[DOMAIN][entry.entry_id]
+    connection = coordinator.connection
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "connection": {
+            "transport": connection.transport,
+            "frame_delay_ms": round(connection.frame_delay * 1000),
+            "state": connection.state,
+            "failures": connection.failures,
+            "last_error": connection.last_error,
+            "unit_failures": connection.unit_failures.get(coordinator.unit_id, 0),
+            "latency_ms": round(connection.latency * 1000, 1) if connection.latency is not None else None,
+            "requests": connection.requests,
+            "queued": connection.queued,
+            "shared_by_units": connection.users,
+            "trace": connection.trace.as_dict() if connection.trace is not None else None,
+        },
+        "polling": {
+            "unit_id": coordinator.unit_id,
+            "max_block_size": coordinator.max_block_size,
+            "max_read_gap": coordinator.max_read_gap,
+            "read_requests": coordinator.read_requests,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "last_update_success": coordinator.last_update_success,
+            "adaptive_factor": coordinator.adaptive.factor,
+            "read_plan": [
+                {"type": block.reg_type, "address": block.address, "count": block.count, "poll": block.poll}
+                for block in coordinator.read_plan
+            ],
+        },
+        "writes": {
+            **coordinator.guard.as_dict(),
+            "coalesced_submitted": coordinator.coalescer.submitted,
+            "coalesced_written": coordinator.coalescer.written,
+            "pending": len(coordinator.coalescer),
+        },
+        "pv_controller": coordinator.pv_controller.as_dict() if coordinator.pv_controller else None,
+        "sampling": coordinator.sampler.as_dict() if coordinator.sampler else None,
+        "stats": coordinator.stats.as_dict(),
+        "history": coordinator.history.as_dict(),
+        "data": coordinator.data,
+    }
@@ -0,0 +1,191 @@
+"""Register discovery: find mapped addresses and draft a profile for unknown firmware.
+
+Deliberately free of Home Assistant and package imports so that
+``scripts/discover_registers.py`` can load this file on its own; the options
+flow runs the same code over the integration's shared connection.
+
+The sweep reads large blocks and bisects every block the device rejects
+(illegal data address) until only the mapped addresses remain. The found
+addresses are then sampled a few times and classified by how often they
+change, which gives the suggested poll tier.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+# (reg_type, address, count) -> words, or None if the device answered with an exception.
+# A request the device left unanswered raises TimeoutError.
+ReadFn = Callable[[str, int, int], Awaitable["list[int] | None"]]
+
+CLASS_STATIC = "static"
+CLASS_SLOW = "slow"
+CLASS_FAST = "fast"
+
+# Suggested poll tier per class. Static values are usually settings that can
+# still be changed on the device panel, so they are polled slowly, not "once".
+SUGGESTED_POLL = {CLASS_STATIC: "slow", CLASS_SLOW: "normal", CLASS_FAST: "fast"}
+
+# Share of sample intervals with a change from which a register counts as fast
+FAST_CHANGE_RATE = 0.25
+
+DEFAULT_RANGES: dict[str, tuple[int, int]] = {"input": (0, 256), "holding": (0, 256)}
+DEFAULT_BLOCK_SIZE = 64
+MAX_BLOCK_SIZE = 125  # Modbus limit for FC3/FC4
+
+
+@dataclass
+class Discovery:
+    """Addresses found per register type plus the values sampled from them."""
+
+    samples: dict[tuple[str, int], list[int]] = field(default_factory=dict)
+    requests: int = 0
+    rejected: int = 0  # exception responses seen while bisecting
+    timeouts: int = 0  # unanswered requests, treated like rejections
+    duration: float = 0.0
+
+    def classify(self, slot: tuple[str, int]) -> str:
+        values = self.samples[slot]
+        changes = sum(1 for previous, current in zip(values, values[1:]) if previous != current)
+        if not changes:
+            return CLASS_STATIC
+        if changes >= FAST_CHANGE_RATE * (len(values) - 1):
+            return CLASS_FAST
+        return CLASS_SLOW
+
+
+class _CountingReader:
+    def __init__(self, read: ReadFn, discovery: Discovery) -> None:
+        self._read = read
+        self._discovery = discovery
+
+    async def __call__(self, reg_type: str, address: int, count: int) -> list[int] | None:
+        self._discovery.requests += 1
+        try:
+            words = await self._read(reg_type, address, count)
+        except asyncio.TimeoutError:
+            # Some gateways time out instead of answering "illegal address"; one lost
+            # answer must not end a sweep that takes minutes.
+            self._discovery.timeouts += 1
+            self._discovery.rejected += 1
+            return None
+        if words is None or len(words) < count:
+            self._discovery.rejected += 1
+            return None
+        return words
+
+
+async def scan_range(read: ReadFn, reg_type: str, start: int, end: int, block_size: int) -> dict[int, int]:
+    """Return ``address -> word`` for every readable address in ``[start, end)``."""
+
+    found: dict[int, int] = {}
+
+    async def _scan(address: int, count: int) -> None:
+        words = await read(reg_type, address, count)
+        if words is not None:
+            found.update(zip(range(address, address + count), words))
+            return
+        if count == 1:
+            return  # unmapped
+        half = count // 2
+        await _scan(address, half)
+        await _scan(address + half, count - half)
+
+    for address in range(start, end, block_size):
+        await _scan(address, min(block_size, end - address))
+    return found
+
+
+def contiguous_runs(addresses: Iterable[int], max_count: int) -> list[tuple[int, int]]:
+    """``(start, count)`` runs of adjacent addresses, at most ``max_count`` long."""
+
+    runs: list[tuple[int, int]] = []
+    for address in sorted(addresses):
+        if runs:
+            start, count = runs[-1]
+            if address == start + count and count < max_count:
+                runs[-1] = (start, count + 1)
+                continue
+        runs.append((address, 1))
+    return runs
+
+
+async def discover(
+    read: ReadFn,
+    ranges: dict[str, tuple[int, int]] | None = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    samples: int = 6,
+    interval: float = 10.0,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+) -> Discovery:
+    """Sweep ``ranges`` and sample every found address ``samples`` times, ``interval`` seconds apart."""
+
+    started = time.monotonic()
+    discovery = Discovery()
+    counted = _CountingReader(read, discovery)
+    block_size = max(1, min(block_size, MAX_BLOCK_SIZE))
+
+    found: dict[str, dict[int, int]] = {}
+    for reg_type, (start, end) in (ranges or DEFAULT_RANGES).items():
+        found[reg_type] = await scan_range(counted, reg_type, start, end, block_size)
+        for address, word in found[reg_type].items():
+            discovery.samples[(reg_type, address)] = [word]
+
+    # Re-read only what exists, as contiguous blocks (no more rejections expected).
+    for _ in range(samples - 1):
+        await sleep(interval)
+        for reg_type, words in found.items():
+            for start, count in contiguous_runs(words, block_size):
+                values = await counted(reg_type, start, count)
+                for offset, word in enumerate(values or ()):
+                    discovery.samples[(reg_type, start + offset)].append(word)
+
+    discovery.duration = time.monotonic() - started
+    return discovery
+
+
+def draft_profile(discovery: Discovery, model: str, block_size: int = DEFAULT_BLOCK_SIZE) -> dict[str, Any]:
+    """Profile skeleton exposing every found register as a sensor with a suggested poll tier.
+
+    Keys, names, scales and entity types still need a human; the ``discovery``
+    section documents what was seen and is ignored when the profile is loaded.
+    """
+
+    sensors: list[dict[str, Any]] = []
+    details: dict[str, Any] = {}
+    by_type: dict[str, list[int]] = {}
+    for (reg_type, address), values in sorted(discovery.samples.items()):
+        key = f"{reg_type}_{address}"
+        klass = discovery.classify((reg_type, address))
+        sensors.append(
+            {
+                "key": key,
+                "name": f"{reg_type.capitalize()} {address}",
+                "register_type": reg_type,
+                "address": address,
+                "poll": SUGGESTED_POLL[klass],
+            }
+        )
+        details[key] = {"class": klass, "min": min(values), "max": max(values), "last": values[-1]}
+        by_type.setdefault(reg_type, []).append(address)
+
+    return {
+        "device": {"manufacturer": "EcoDesign", "model": model},
+        "registers": {"sensors": sensors},
+        "discovery": {
+            "requests": discovery.requests,
+            "rejected": discovery.rejected,
+            "timeouts": discovery.timeouts,
+            "duration_s": round(discovery.duration, 1),
+            "samples": max((len(values) for values in discovery.samples.values()), default=0),
+            "blocks": [
+                {"register_type": reg_type, "address": start, "count": count}
+                for reg_type, addresses in sorted(by_type.items())
+                for start, count in contiguous_runs(addresses, block_size)
+            ],
+            "registers": details,
+        },
+    }
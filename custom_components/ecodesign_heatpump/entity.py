@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ED300Coordinator
+
+
+class ED300Entity(CoordinatorEntity[ED300Coordinator]):
+    """Base entity that only writes state when one of its data keys changed."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: ED300Coordinator, keys: Iterable[str] | None) -> None:
+        super().__init__(coordinator)
+        # None = not backed by register data, update on every coordinator refresh
+        self._coordinator_keys = frozenset(keys) if keys is not None else None
+        self._last_available: bool | None = None
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, f"{coordinator.host}:{coordinator.unit_id}")},
+            "manufacturer": coordinator.device["manufacturer"],
+            "model": coordinator.device["model"],
+            # Units behind one gateway must be told apart in the device list.
+            "name": f"EcoDesign ED300 {coordinator.unit_id}",
+        }
+
+    def _value(self, key: str) -> Any:
+        """Current value of a data key; None before the first snapshot or poll."""
+
+        data = self.coordinator.data
+        return data.get(key) if data else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        changed = self.coordinator.changed_keys
+        available = self.available
+        if (
+            changed is not None
+            and self._coordinator_keys is not None
+            and available == self._last_available
+            and self._coordinator_keys.isdisjoint(changed)
+        ):
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Mapping
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+
+class WriteGuard:
+    """Last check before holding words go to the bus.
+
+    * Words equal to the last confirmed value (read from the device or
+      acknowledged by it) are skipped, so automations re-sending the same mode
+      every few minutes cause no traffic. A confirmation only counts for
+      ``max_age`` seconds, about one poll interval of its block: once the
+      regular read is overdue (link trouble, a value changed on the panel
+      meanwhile) the write goes through.
+    * An address written less than its ``min_interval`` ago rejects the write.
+    * Every address has a daily budget; the counts survive restarts via the
+      coordinator snapshot and reset at local midnight.
+
+    Limits are per word address, ``(min_interval_s, daily_budget)``, compiled
+    from the profile's ``write_limits`` and per-register overrides.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[int, tuple[float, int]],
+        default: tuple[float, int],
+        max_age: Mapping[int, float],
+        default_max_age: float,
+    ) -> None:
+        self._limits = limits
+        self._default = default
+        self._max_age = max_age
+        self._default_max_age = default_max_age
+        self.confirmed: dict[int, int] = {}
+        self._confirmed_at: dict[int, float] = {}  # monotonic
+        self._last_write: dict[int, float] = {}  # monotonic
+        self._day = _today()
+        self.writes_today: dict[int, int] = {}
+        self.written = 0
+        self.skipped = 0
+        self.rejected_interval = 0
+        self.rejected_budget = 0
+
+    def observe(self, address: int, word: int) -> None:
+        """Remember a word read from the device."""
+
+        self.confirmed[address] = word
+        self._confirmed_at[address] = time.monotonic()
+
+    def is_confirmed(self, address: int, word: int, now: float | None = None) -> bool:
+        """Whether ``word`` is the device's value at ``address`` as of a recent read or write."""
+
+        if self.confirmed.get(address) != word:
+            return False
+        age = (time.monotonic() if now is None else now) - self._confirmed_at[address]
+        return age <= self._max_age.get(address, self._default_max_age)
+
+    def check(self, raw: Mapping[int, int]) -> dict[int, int]:
+        """Return the words that need writing; raise if any of them is not allowed now.
+
+        All-or-nothing: a rejected address blocks the whole write, so a
+        multi-register change is never applied halfway.
+        """
+
+        self._roll_day()
+        now = time.monotonic()
+        changed = {address: word for address, word in raw.items() if not self.is_confirmed(address, word, now)}
+        self.skipped += len(raw) - len(changed)
+        for address in changed:
+            interval, budget = self._limits.get(address, self._default)
+            last = self._last_write.get(address)
+            if interval and last is not None and now - last < interval:
+                self.rejected_interval += 1
+                raise HomeAssistantError(
+                    f"holding register {address} was written {now - last:.0f} s ago; "
+                    f"the minimum interval is {interval:.0f} s"
+                )
+            if self.writes_today.get(address, 0) >= budget:
+                self.rejected_budget += 1
+                raise HomeAssistantError(
+                    f"daily write budget of holding register {address} ({budget} writes) is used up"
+                )
+        return changed
+
+    def record(self, written: Mapping[int, int]) -> None:
+        """Count words the device acknowledged; they are the new confirmed values."""
+
+        now = time.monotonic()
+        for address, word in written.items():
+            self.confirmed[address] = word
+            self._confirmed_at[address] = now
+            self._last_write[address] = now
+            self.writes_today[address] = self.writes_today.get(address, 0) + 1
+            self.written += 1
+
+    def _roll_day(self) -> None:
+        today = _today()
+        if today != self._day:
+            self._day = today
+            self.writes_today.clear()
+
+    def as_state(self) -> dict[str, Any]:
+        return {"day": self._day, "writes": {str(address): count for address, count in self.writes_today.items()}}
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        if state.get("day") != _today() or not isinstance(state.get("writes"), Mapping):
+            return
+        self._day = state["day"]
+        self.writes_today = {int(address): int(count) for address, count in state["writes"].items()}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters for diagnostics."""
+
+        self._roll_day()
+        return {
+            "written": self.written,
+            "skipped_unchanged": self.skipped,
+            "rejected_interval": self.rejected_interval,
+            "rejected_budget": self.rejected_budget,
+            "today": {
+                address: {"writes": count, "budget": self._limits.get(address, self._default)[1]}
+                for address, count in sorted(self.writes_today.items())
+            },
+        }
+
+
+def _today() -> str:
+    return dt_util.now().date().isoformat()
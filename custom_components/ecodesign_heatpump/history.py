@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+
+from .const import HISTORY_MAX_GAP
+
+
+class RingBuffer:
+    """Fixed-size ring of ``(time, value)`` samples backed by two ``array('d')``.
+
+    Keeps running sums so the mean, the time-weighted mean (duty cycle of a
+    0/1 signal) and the least-squares slope over the buffered window are O(1)
+    per sample. The sums are rebuilt from the arrays each time the ring wraps,
+    so float error from add/subtract cannot accumulate.
+    """
+
+    __slots__ = ("size", "_t", "_v", "_head", "_count", "_t0", "_sum_t", "_sum_v", "_sum_tv", "_sum_tt", "_area")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._t = array("d", bytes(8 * size))
+        self._v = array("d", bytes(8 * size))
+        self._head = 0  # next write position
+        self._count = 0
+        self._t0: float | None = None  # keeps the regression sums small
+        self._sum_t = self._sum_v = self._sum_tv = self._sum_tt = 0.0
+        self._area = 0.0  # sum of value * hold time between consecutive samples
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, offset: int) -> int:
+        """Array index of the ``offset``-th oldest sample."""
+
+        return (self._head - self._count + offset) % self.size
+
+    def append(self, timestamp: float, value: float) -> None:
+        if self._t0 is None:
+            self._t0 = timestamp
+        t = timestamp - self._t0
+        if self._count == self.size:
+            # Evict the oldest sample and the hold interval that started with it.
+            old, nxt = self._index(0), self._index(1)
+            self._area -= self._v[old] * (self._t[nxt] - self._t[old])
+            self._remove_sums(self._t[old], self._v[old])
+            self._count -= 1
+        if self._count:
+            last = self._index(self._count - 1)
+            self._area += self._v[last] * (t - self._t[last])
+        self._t[self._head] = t
+        self._v[self._head] = value
+        self._sum_t += t
+        self._sum_v += value
+        self._sum_tv += t * value
+        self._sum_tt += t * t
+        self._head = (self._head + 1) % self.size
+        self._count += 1
+        if self._head == 0:
+            self._rebuild()
+
+    def _remove_sums(self, t: float, value: float) -> None:
+        self._sum_t -= t
+        self._sum_v -= value
+        self._sum_tv -= t * value
+        self._sum_tt -= t * t
+
+    def _rebuild(self) -> None:
+        samples = list(self.samples())
+        self._sum_t = sum(t for t, _ in samples)
+        self._sum_v = sum(v for _, v in samples)
+        self._sum_tv = sum(t * v for t, v in samples)
+        self._sum_tt = sum(t * t for t, _ in samples)
+        self._area = sum(v * (t_next - t) for (t, v), (t_next, _) in zip(samples, samples[1:]))
+
+    def samples(self) -> Iterable[tuple[float, float]]:
+        """Samples oldest first, times relative to the first sample ever recorded."""
+
+        for offset in range(self._count):
+            index = self._index(offset)
+            yield self._t[index], self._v[index]
+
+    @property
+    def span(self) -> float:
+        """Seconds between the oldest and the newest sample."""
+
+        if self._count < 2:
+            return 0.0
+        return self._t[self._index(self._count - 1)] - self._t[self._index(0)]
+
+    def mean(self) -> float | None:
+        return self._sum_v / self._count if self._count else None
+
+    def time_weighted_mean(self) -> float | None:
+        """Mean with every sample held until the next one (duty cycle for 0/1 values)."""
+
+        span = self.span
+        return self._area / span if span > 0 else None
+
+    def slope(self) -> float | None:
+        """Least-squares slope in value units per second."""
+
+        n = self._count
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t**2
+        if denominator <= 0:
+            return None
+        return (n * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+
+@dataclass(slots=True)
+class RuntimeCounter:
+    """On-time and off→on transitions of a relay, updated per sample."""
+
+    source: str
+    runtime: float = 0.0  # seconds
+    cycles: int = 0
+    _last_time: float | None = None
+    _last_on: bool | None = None
+
+    def update(self, timestamp: float, on: bool) -> None:
+        if self._last_on is not None and self._last_time is not None:
+            # Long gaps (link down, HA paused) are not counted as either state.
+            if self._last_on and timestamp - self._last_time <= HISTORY_MAX_GAP:
+                self.runtime += timestamp - self._last_time
+            if on and not self._last_on:
+                self.cycles += 1
+        self._last_time = timestamp
+        self._last_on = on
+
+
+class History:
+    """Recent samples of every numeric sensor register plus the derived statistics of the profile.
+
+    ``config`` is the profile's ``history`` section: ``samples`` (ring size),
+    ``runtime`` (relays to count runtime, cycles and duty cycle for) and
+    ``rate`` (values whose rate of change per hour is reported).
+    """
+
+    def __init__(self, config: Mapping[str, Any], keys: Iterable[str]) -> None:
+        self.samples: int = config["samples"]
+        self.buffers: dict[str, RingBuffer] = {key: RingBuffer(self.samples) for key in keys}
+        self.runtime: dict[str, RuntimeCounter] = {
+            item["key"]: RuntimeCounter(item["source"]) for item in config["runtime"]
+        }
+        self.rate: dict[str, str] = {item["key"]: item["source"] for item in config["rate"]}
+        for source in [*(counter.source for counter in self.runtime.values()), *self.rate.values()]:
+            self.buffers.setdefault(source, RingBuffer(self.samples))
+
+    def record(self, timestamp: float, data: Mapping[str, Any]) -> dict[str, Any]:
+        """Add one poll's values and return the derived statistics as data keys."""
+
+        for key, buffer in self.buffers.items():
+            value = data.get(key)
+            if isinstance(value, (int, float)):
+                buffer.append(timestamp, float(value))
+
+        derived: dict[str, Any] = {}
+        for key, counter in self.runtime.items():
+            value = data.get(counter.source)
+            if value is not None:
+                counter.update(timestamp, bool(value))
+            duty = self.buffers[counter.source].time_weighted_mean()
+            derived[f"{key}_runtime"] = round(counter.runtime / 3600, 2)
+            derived[f"{key}_cycles"] = counter.cycles
+            derived[f"{key}_duty_cycle"] = round(100 * duty, 1) if duty is not None else None
+        for key, source in self.rate.items():
+            slope = self.buffers[source].slope()
+            derived[key] = round(slope * 3600, 2) if slope is not None else None
+        return derived
+
+    def as_state(self) -> dict[str, Any]:
+        """Runtime totals to persist across restarts (the rings themselves are not kept)."""
+
+        return {key: {"runtime": counter.runtime, "cycles": counter.cycles} for key, counter in self.runtime.items()}
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        for key, counter in self.runtime.items():
+            saved = state.get(key)
+            if isinstance(saved, Mapping):
+                counter.runtime = float(saved.get("runtime", 0.0))
+                counter.cycles = int(saved.get("cycles", 0))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Window summary per buffered key for diagnostics."""
+
+        summary: dict[str, Any] = {}
+        for key, buffer in self.buffers.items():
+            values = [value for _, value in buffer.samples()]
+            summary[key] = {
+                "samples": len(buffer),
+                "span_s": round(buffer.span, 1),
+                "min": min(values, default=None),
+                "max": max(values, default=None),
+                "mean": round(mean, 3) if (mean := buffer.mean()) is not None else None,
+            }
+        return summary
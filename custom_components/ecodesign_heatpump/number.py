@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from homeassistant.components.number import NumberEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
-from .coordinator import ED300Coordinator, RegisterDef
+from .coordinator import ED300Coordinator
+from .entity import ED300Entity
+from .profile import RegisterDef
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator: ED300Coordinator = hass.data[DOMAIN][entry.entry_id]
@@ -13,11 +14,9 @@ async def async_setup_entry(hass, entry, async_add_entities):
         entities.append(ED300Number(coordinator, r))
     async_add_entities(entities)
 
-class ED300Number(CoordinatorEntity[ED300Coordinator], NumberEntity):
-    _attr_has_entity_name = True
-
+class ED300Number(ED300Entity, NumberEntity):
     def __init__(self, coordinator: ED300Coordinator, reg: RegisterDef) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, (reg.key,))
         self.reg = reg
         self._attr_name = reg.name
         self._attr_unique_id = f"{coordinator.host}-{coordinator.unit_id}-number-{reg.key}"
@@ -25,17 +24,11 @@ class ED300Number(CoordinatorEntity[ED300Coordinator], NumberEntity):
         self._attr_native_max_value = reg.max_value if reg.max_value is not None else 100
         self._attr_native_step = reg.step if reg.step is not None else 1
         self._attr_native_unit_of_measurement = reg.unit
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, f"{coordinator.host}:{coordinator.unit_id}")},
-            "manufacturer": coordinator.device["manufacturer"],
-            "model": coordinator.device["model"],
-            "name": "EcoDesign ED300",
-        }
 
     @property
     def native_value(self):
-        return self.coordinator.data.get(self.reg.key)
+        return self._value(self.reg.key)
 
     async def async_set_native_value(self, value: float) -> None:
-        raw = int(round(value / (self.reg.scale or 1)))
-        await self.coordinator.async_write_register(self.reg.address, raw)
+        # Scaling, offset and signedness come from the profile; slider drags are coalesced.
+        await self.coordinator.async_write_coalesced({self.reg.key: value})
@@ -0,0 +1,137 @@
+"""Modbus handshake run by the config and options flow.
+
+Reads a block the profile says exists to prove the unit id answers, then
+measures the link: the median round trip of a one-register read, the largest
+block the gateway/device accepts and, from the extra time a large block costs
+per word, how many unused addresses are worth bridging inside a block. The
+results are stored in the entry and replace the transport defaults of the read
+planner.
+"""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .connection import ModbusConnection, ModbusLinkError
+from .const import (
+    CONF_LINK_LATENCY,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_READ_GAP,
+    PRIORITY_CONFIRM,
+    PROBE_BLOCK_SIZES,
+    PROBE_PINGS,
+    TRANSPORT_DEFAULTS,
+)
+from .profile import CompiledProfile
+
+_LOGGER = logging.getLogger(__name__)
+
+# Exception code for reads touching unmapped addresses; a count beyond the
+# device/gateway limit answers 3 (illegal data value) or times out.
+_ILLEGAL_ADDRESS = 2
+
+# Flow error keys
+PROBE_CANNOT_CONNECT = "cannot_connect"
+PROBE_NO_RESPONSE = "no_response"
+PROBE_PROFILE_MISMATCH = "profile_mismatch"
+
+
+class ProbeError(Exception):
+    """The handshake failed; ``reason`` is the flow error key."""
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+@dataclass(slots=True)
+class ProbeResult:
+    latency_ms: float  # median round trip of a one-register read
+    max_block_size: int
+    max_read_gap: int
+    strict: bool = False  # rejects reads spanning unmapped addresses
+
+    def as_config(self) -> dict[str, Any]:
+        return {
+            CONF_LINK_LATENCY: self.latency_ms,
+            CONF_MAX_BLOCK_SIZE: self.max_block_size,
+            CONF_MAX_READ_GAP: self.max_read_gap,
+        }
+
+
+async def _timed_read(
+    connection: ModbusConnection, unit_id: int, reg_type: str, address: int, count: int
+) -> tuple[Any, float]:
+    """Response and round trip; ``PRIORITY_CONFIRM`` keeps the probe from queueing behind polling."""
+
+    start = time.monotonic()
+    response = await connection.async_read_response(reg_type, address, count, unit_id, PRIORITY_CONFIRM)
+    return response, time.monotonic() - start
+
+
+async def async_probe(connection: ModbusConnection, unit_id: int, profile: CompiledProfile) -> ProbeResult:
+    """Handshake with ``unit_id`` over ``connection``; raises :class:`ProbeError`."""
+
+    _, default_block, default_gap = TRANSPORT_DEFAULTS[connection.transport]
+    # Gap-free plan: every address of these blocks is mapped on a matching firmware.
+    known = max(profile.read_plan(0, default_block), key=lambda block: block.count, default=None)
+    if known is None:
+        raise ProbeError(PROBE_PROFILE_MISMATCH, f"profile {profile.model} has no registers to read")
+
+    try:
+        response, _ = await _timed_read(connection, unit_id, known.reg_type, known.address, known.count)
+    except ModbusLinkError as err:
+        connection.reset_backoff(unit_id)
+        if isinstance(err.__cause__, ConnectionError):
+            raise ProbeError(PROBE_CANNOT_CONNECT, f"cannot connect to {connection.label}: {err}") from err
+        raise ProbeError(PROBE_NO_RESPONSE, f"unit {unit_id} on {connection.label} did not answer: {err}") from err
+    if response.isError():
+        raise ProbeError(
+            PROBE_PROFILE_MISMATCH,
+            f"unit {unit_id} rejected {known.reg_type} {known.address}+{known.count} expected by profile {profile.model}",
+        )
+
+    pings: list[float] = []
+    for _ in range(PROBE_PINGS):
+        response, elapsed = await _timed_read(connection, unit_id, known.reg_type, known.address, 1)
+        if not response.isError():
+            pings.append(elapsed)
+    if not pings:
+        raise ProbeError(PROBE_NO_RESPONSE, f"unit {unit_id} on {connection.label} stopped answering")
+    rtt = statistics.median(pings)
+
+    # Grow the block until the first rejection or timeout; the last accepted size wins.
+    max_block, block_rtt, strict = known.count, None, False
+    for count in (size for size in PROBE_BLOCK_SIZES if size > known.count):
+        if known.address + count > 0x10000:
+            break
+        try:
+            timings = [await _timed_read(connection, unit_id, known.reg_type, known.address, count) for _ in range(3)]
+        except ModbusLinkError as err:
+            _LOGGER.debug("Probe of %s words on %s failed: %s", count, connection.label, err)
+            connection.reset_backoff(unit_id)
+            break
+        rejected = [response for response, _ in timings if response.isError()]
+        if rejected:
+            # Either the size limit (exception 3) or, on firmwares that reject unmapped
+            # addresses (exception 2), the end of the mapped run. Those need gap-free
+            # blocks, and no block can outgrow the longest mapped run: ``known``.
+            strict = any(getattr(response, "exception_code", None) == _ILLEGAL_ADDRESS for response in rejected)
+            break
+        max_block, block_rtt = count, statistics.median(elapsed for _, elapsed in timings)
+
+    # Bridging g unused words pays off while g words cost less than one extra request.
+    max_gap = min(default_gap, max_block)
+    if strict:
+        max_gap = 0
+    elif block_rtt is not None and block_rtt > rtt:
+        per_word = (block_rtt - rtt) / (max_block - 1)
+        max_gap = min(max_block, int(rtt / per_word))
+
+    result = ProbeResult(round(rtt * 1000, 1), max_block, max_gap, strict)
+    _LOGGER.debug("Probe of unit %s on %s: %s", unit_id, connection.label, result)
+    return result
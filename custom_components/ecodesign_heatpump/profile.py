@@ -0,0 +1,510 @@
+"""Register profiles: schema validation, compilation and a process-wide cache.
+
+A profile (``profiles/<model>.json``) is parsed, validated and compiled into
+the lookup tables the coordinator needs exactly once per file version. Every
+coordinator for the same model shares the resulting :class:`CompiledProfile`,
+so reloads and option changes neither re-parse the file nor touch the disk
+from the event loop.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Sequence
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+from voluptuous.humanize import humanize_error
+
+from .const import (
+    DEFAULT_DAILY_WRITE_BUDGET,
+    DEFAULT_HISTORY_SAMPLES,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_READ_GAP,
+    DEFAULT_MIN_WRITE_INTERVAL,
+    POLL_CLASSES,
+    POLL_NORMAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(__file__).resolve().parent / "profiles"
+
+REGISTER_CATEGORIES = ("sensors", "numbers", "selects", "switches")
+WRITABLE_CATEGORIES = ("numbers", "selects", "switches")
+
+# data type -> (words, signed); 32-bit values are sent high word first.
+DATA_TYPES: dict[str, tuple[int, bool]] = {
+    "uint16": (1, False),
+    "int16": (1, True),
+    "uint32": (2, False),
+    "int32": (2, True),
+}
+
+
+class ProfileError(Exception):
+    """A register profile is missing, malformed or internally inconsistent."""
+
+
+@dataclass(slots=True)
+class RegisterDef:
+    """Light-weight description of a single Modbus register.
+
+    Everything needed to decode/encode the value (word count, sign bit, rounding,
+    enum and bit lookups) is precomputed once when the profile is compiled.
+    """
+
+    key: str
+    name: str
+    reg_type: str
+    address: int
+    scale: float | None = None
+    unit: str | None = None
+    min_value: float | None = None
+    max_value: float | None = None
+    step: float | None = None
+    options: list[tuple[str, int]] | None = None
+    poll: str = POLL_NORMAL
+    burst_on_change: bool = False
+    data_type: str = "uint16"
+    offset: float | None = None
+    # named bits of a bitfield register: (name, bit index)
+    bits: list[tuple[str, int]] | None = None
+    # write guard overrides; None = the profile's "write_limits"
+    min_write_interval: float | None = None
+    daily_write_budget: int | None = None
+
+    words: int = field(init=False, repr=False)
+    option_by_code: dict[int, str] = field(init=False, repr=False)
+    code_by_option: dict[str, int] = field(init=False, repr=False)
+    # data key and mask per named bit, e.g. ("status_bits.bit_3", 0x8)
+    bit_keys: tuple[tuple[str, int], ...] = field(init=False, repr=False)
+    _sign_bit: int = field(init=False, repr=False)
+    _digits: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.words, signed = DATA_TYPES[self.data_type]
+        self._sign_bit = 1 << (16 * self.words - 1) if signed else 0
+        self.option_by_code = {code: label for label, code in self.options or []}
+        self.code_by_option = {label: code for label, code in self.options or []}
+        self.bit_keys = tuple((f"{self.key}.{name}", 1 << bit) for name, bit in self.bits or [])
+        # Round away float noise (23.500000000000004) to the precision of scale/offset.
+        self._digits = max(
+            (
+                max(0, -Decimal(repr(factor)).normalize().as_tuple().exponent)
+                for factor in (self.scale, self.offset)
+                if factor
+            ),
+            default=0,
+        )
+
+    def decode(self, raw: int) -> Any:
+        """Convert the raw (unsigned, words joined) register value into the entity value."""
+
+        if raw & self._sign_bit:
+            raw -= self._sign_bit << 1
+        if self.scale is None and self.offset is None:
+            return raw
+        value = raw * (self.scale or 1) + (self.offset or 0)
+        return round(value, self._digits) if self._digits else value
+
+    def encode(self, value: Any) -> list[int]:
+        """Validate a user value (number, option label or code) and convert it to register words."""
+
+        if self.options:
+            if isinstance(value, str) and value in self.code_by_option:
+                raw = self.code_by_option[value]
+            else:
+                try:
+                    raw = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"invalid option for {self.key}: {value!r}") from None
+                if raw not in self.option_by_code:
+                    raise ValueError(f"invalid option for {self.key}: {value!r}")
+        else:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"invalid value for {self.key}: {value!r}") from None
+            if (self.min_value is not None and number < self.min_value) or (
+                self.max_value is not None and number > self.max_value
+            ):
+                raise ValueError(f"{self.key}={number} outside [{self.min_value}, {self.max_value}]")
+            raw = int(round((number - (self.offset or 0)) / (self.scale or 1)))
+            low = -(self._sign_bit << 1) // 2 if self._sign_bit else 0
+            high = (self._sign_bit or 1 << (16 * self.words)) - 1
+            if not low <= raw <= high:
+                raise ValueError(f"{self.key}={number} does not fit a {self.data_type} register")
+            raw &= (1 << (16 * self.words)) - 1
+        return [(raw >> (16 * shift)) & 0xFFFF for shift in reversed(range(self.words))]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], default_poll: str = POLL_NORMAL) -> RegisterDef:
+        """Create a :class:`RegisterDef` from a validated profile entry."""
+
+        raw_options = data.get("options") or []
+        options = [(str(label), int(code)) for label, code in raw_options] or None
+
+        def _to_float(value: Any | None) -> float | None:
+            return float(value) if value is not None else None
+
+        return cls(
+            key=data["key"],
+            name=data.get("name", data["key"]),
+            reg_type=data["register_type"],
+            address=data["address"],
+            scale=_to_float(data.get("scale")),
+            unit=data.get("unit"),
+            min_value=_to_float(data.get("min")),
+            max_value=_to_float(data.get("max")),
+            step=_to_float(data.get("step")),
+            options=options,
+            poll=data.get("poll", default_poll),
+            burst_on_change=data["burst_on_change"],
+            data_type=data["data_type"],
+            offset=_to_float(data.get("offset")),
+            bits=[(str(name), int(bit)) for name, bit in data.get("bits") or []] or None,
+            min_write_interval=_to_float(data.get("min_write_interval")),
+            daily_write_budget=data.get("daily_write_budget"),
+        )
+
+
+@dataclass(slots=True)
+class ReadBlock:
+    """Contiguous span of registers fetched with a single Modbus request."""
+
+    reg_type: str
+    address: int
+    count: int
+    addresses: list[int]
+    poll: str = POLL_NORMAL
+    # Decode table: (word index in block, words, registers sharing the value);
+    # filled by CompiledProfile.read_plan.
+    fields: list[tuple[int, int, Sequence[RegisterDef]]] = field(default_factory=list, repr=False)
+
+
+def build_read_plan(
+    slots: Mapping[tuple[str, int], str],
+    max_gap: int = DEFAULT_MAX_READ_GAP,
+    max_count: int = DEFAULT_MAX_BLOCK_SIZE,
+    widths: Mapping[tuple[str, int], int] | None = None,
+) -> list[ReadBlock]:
+    """Group unique ``(reg_type, address) -> poll class`` slots into contiguous read blocks.
+
+    Blocks never mix register types or poll classes. Up to ``max_gap`` unused
+    addresses are bridged between two registers and a block never spans more
+    than ``max_count`` words. ``widths`` gives the word count of multi-register
+    values, which are never split across blocks.
+    """
+
+    groups: dict[tuple[str, str], set[int]] = {}
+    for (reg_type, address), poll in slots.items():
+        groups.setdefault((reg_type, poll), set()).add(address)
+
+    blocks: list[ReadBlock] = []
+    for reg_type, poll in sorted(groups):
+        current: ReadBlock | None = None
+        for address in sorted(groups[(reg_type, poll)]):
+            width = widths.get((reg_type, address), 1) if widths else 1
+            if current is not None:
+                span = address + width - current.address
+                if address - (current.address + current.count) <= max_gap and span <= max_count:
+                    current.count = max(current.count, span)
+                    current.addresses.append(address)
+                    continue
+            current = ReadBlock(reg_type=reg_type, address=address, count=width, addresses=[address], poll=poll)
+            blocks.append(current)
+    return blocks
+
+
+# [label, code]
+_OPTION = vol.ExactSequence([vol.Coerce(str), vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF))])
+
+REGISTER_SCHEMA = vol.Schema(
+    {
+        vol.Required("key"): vol.All(str, vol.Length(min=1)),
+        vol.Optional("name"): str,
+        vol.Optional("register_type", default="holding"): vol.In(("input", "holding")),
+        vol.Required("address"): vol.All(int, vol.Range(min=0, max=0xFFFF)),
+        vol.Optional("scale"): vol.Coerce(float),
+        vol.Optional("unit"): vol.Any(None, str),
+        vol.Optional("min"): vol.Coerce(float),
+        vol.Optional("max"): vol.Coerce(float),
+        vol.Optional("step"): vol.Coerce(float),
+        vol.Optional("options"): [_OPTION],
+        vol.Optional("poll"): vol.In(POLL_CLASSES),
+        vol.Optional("burst_on_change", default=False): bool,
+        vol.Optional("data_type", default="uint16"): vol.In(DATA_TYPES),
+        vol.Optional("offset"): vol.Coerce(float),
+        # [name, bit]
+        vol.Optional("bits"): [vol.ExactSequence([vol.Coerce(str), vol.All(int, vol.Range(min=0, max=31))])],
+        vol.Optional("min_write_interval"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("daily_write_budget"): vol.All(int, vol.Range(min=1)),
+    }
+)
+
+CLIMATE_SCHEMA = vol.Schema(
+    {
+        vol.Required("setpoint_register"): vol.All(int, vol.Range(min=0, max=0xFFFF)),
+        vol.Optional("current_temp_key"): str,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+_DERIVED = {vol.Required("key"): str, vol.Required("source"): str, vol.Optional("name"): str}
+
+HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("samples", default=DEFAULT_HISTORY_SAMPLES): vol.All(int, vol.Range(min=2, max=100_000)),
+        # relays: runtime (h), cycles and duty cycle (%) over the window
+        vol.Optional("runtime", default=[]): [_DERIVED],
+        # values: rate of change per hour over the window
+        vol.Optional("rate", default=[]): [{**_DERIVED, vol.Optional("unit"): str}],
+    }
+)
+
+# PV-surplus controller: which select it drives, the option per stage and the
+# relays whose draw is added back to the measured export
+PV_SCHEMA = vol.Schema(
+    {
+        vol.Required("mode_key"): str,
+        vol.Required("modes"): {vol.Required("off"): str, vol.Required("wp"): str, vol.Required("both"): str},
+        vol.Optional("wp_relay"): str,
+        vol.Optional("el_relay"): str,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("device", default={}): {vol.Optional("manufacturer"): str, vol.Optional("model"): str},
+        vol.Optional("poll_defaults", default={}): {vol.In(REGISTER_CATEGORIES): vol.In(POLL_CLASSES)},
+        vol.Required("registers"): {
+            **{vol.Optional(category, default=[]): [REGISTER_SCHEMA] for category in REGISTER_CATEGORIES},
+            vol.Optional("climate"): CLIMATE_SCHEMA,
+        },
+        vol.Optional("history", default={}): HISTORY_SCHEMA,
+        vol.Optional("pv"): PV_SCHEMA,
+        # write guard defaults for every writable register
+        vol.Optional("write_limits", default={}): {
+            vol.Optional("min_interval", default=DEFAULT_MIN_WRITE_INTERVAL): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional("daily_budget", default=DEFAULT_DAILY_WRITE_BUDGET): vol.All(int, vol.Range(min=1)),
+        },
+        # written by the register discovery, informational only
+        vol.Optional("discovery"): dict,
+    }
+)
+
+
+@dataclass
+class CompiledProfile:
+    """Validated profile plus the lookup tables derived from it.
+
+    Shared between coordinators – treat every attribute as read-only.
+    """
+
+    model: str
+    device: dict[str, Any]
+    # category -> registers; "climate" holds the raw climate description
+    registers: dict[str, Any]
+    # (reg_type, start address) -> every register sharing that value
+    registers_by_slot: dict[tuple[str, int], list[RegisterDef]]
+    # A word shared by several registers is polled in the fastest class any of them asks for.
+    slot_polls: dict[tuple[str, int], str]
+    writable_by_key: dict[str, RegisterDef]
+    # Keys whose change (e.g. a relay switching) warrants a burst of fast polls.
+    burst_keys: frozenset[str]
+    # validated "history" section (ring size, runtime and rate statistics)
+    history: dict[str, Any] = field(default_factory=dict)
+    # validated "pv" section, None if the model has no PV/Smart-Grid input
+    pv: dict[str, Any] | None = None
+    # holding word address -> (min seconds between writes, writes per day)
+    write_limits: dict[int, tuple[float, int]] = field(default_factory=dict)
+    default_write_limits: tuple[float, int] = (DEFAULT_MIN_WRITE_INTERVAL, DEFAULT_DAILY_WRITE_BUDGET)
+    _plans: dict[tuple[int, int], list[ReadBlock]] = field(default_factory=dict, repr=False)
+
+    def iter_registers(self, categories: Iterable[str] = REGISTER_CATEGORIES) -> Iterable[RegisterDef]:
+        for category in categories:
+            yield from self.registers.get(category, [])
+
+    def read_plan(
+        self, max_gap: int = DEFAULT_MAX_READ_GAP, max_count: int = DEFAULT_MAX_BLOCK_SIZE
+    ) -> list[ReadBlock]:
+        """Return the (memoised) read plan for the given block limits."""
+
+        plan = self._plans.get((max_gap, max_count))
+        if plan is None:
+            widths = {slot: regs[0].words for slot, regs in self.registers_by_slot.items()}
+            plan = build_read_plan(self.slot_polls, max_gap, max_count, widths)
+            for block in plan:
+                block.fields = [
+                    (
+                        address - block.address,
+                        widths[(block.reg_type, address)],
+                        tuple(self.registers_by_slot[(block.reg_type, address)]),
+                    )
+                    for address in block.addresses
+                ]
+            self._plans[(max_gap, max_count)] = plan
+        return plan
+
+
+def compile_profile(model: str, raw: Any) -> CompiledProfile:
+    """Validate a parsed profile and build its lookup tables; raises :class:`ProfileError`."""
+
+    try:
+        profile = PROFILE_SCHEMA(raw)
+    except vol.Invalid as err:
+        raise ProfileError(f"Invalid EcoDesign profile '{model}': {humanize_error(raw, err)}") from err
+
+    poll_defaults: dict[str, str] = profile["poll_defaults"]
+    registers: dict[str, Any] = {
+        category: [
+            RegisterDef.from_dict(item, poll_defaults.get(category, POLL_NORMAL))
+            for item in profile["registers"][category]
+        ]
+        for category in REGISTER_CATEGORIES
+    }
+
+    seen: dict[str, str] = {}
+    by_slot: dict[tuple[str, int], list[RegisterDef]] = {}
+    # (reg_type, word address) -> first register covering that word
+    occupied: dict[tuple[str, int], RegisterDef] = {}
+    writable: dict[str, RegisterDef] = {}
+    errors: list[str] = []
+    for category in REGISTER_CATEGORIES:
+        for reg in registers[category]:
+            if reg.key in seen:
+                errors.append(f"duplicate key '{reg.key}' ({seen[reg.key]} and {category})")
+            seen[reg.key] = category
+            slot = (reg.reg_type, reg.address)
+            for other in by_slot.get(slot, []):
+                # Several registers may expose the same value, but they have to read it alike.
+                if (other.scale, other.offset, other.data_type) != (reg.scale, reg.offset, reg.data_type):
+                    errors.append(f"'{reg.key}' and '{other.key}' share {slot[0]}@{slot[1]} with different decoding")
+            for name, bit in reg.bits or []:
+                if bit >= 16 * reg.words:
+                    errors.append(f"bit '{name}' of '{reg.key}' is outside its {reg.data_type} value")
+            for word in range(reg.address, reg.address + reg.words):
+                owner = occupied.setdefault((reg.reg_type, word), reg)
+                if owner.address != reg.address:
+                    errors.append(f"'{reg.key}' overlaps '{owner.key}' at {reg.reg_type}@{word}")
+            by_slot.setdefault(slot, []).append(reg)
+            if category in WRITABLE_CATEGORIES:
+                if reg.reg_type != "holding":
+                    errors.append(f"writable '{reg.key}' is not a holding register")
+                    continue
+                clash = next((w for w in writable.values() if w.address == reg.address), None)
+                if clash is not None:
+                    errors.append(f"'{reg.key}' and '{clash.key}' both write holding@{reg.address}")
+                writable[reg.key] = reg
+
+    climate = profile["registers"].get("climate")
+    if climate is not None:
+        registers["climate"] = climate
+        current = climate.get("current_temp_key")
+        if current is not None and current not in seen:
+            errors.append(f"climate current_temp_key '{current}' is not a register key")
+
+    history = profile["history"]
+    derived = [
+        f"{item['key']}_{suffix}" for item in history["runtime"] for suffix in ("runtime", "cycles", "duty_cycle")
+    ]
+    derived += [item["key"] for item in history["rate"]]
+    for item in [*history["runtime"], *history["rate"]]:
+        if item["source"] not in seen:
+            errors.append(f"history source '{item['source']}' is not a register key")
+    for key in derived:
+        if key in seen:
+            errors.append(f"history key '{key}' collides with a register key")
+
+    pv = profile.get("pv")
+    if pv is not None:
+        mode = writable.get(pv["mode_key"])
+        if mode is None or not mode.options:
+            errors.append(f"pv mode_key '{pv['mode_key']}' is not a writable register with options")
+        else:
+            errors.extend(
+                f"pv mode '{label}' is not an option of '{mode.key}'"
+                for label in pv["modes"].values()
+                if label not in mode.code_by_option
+            )
+        for relay in ("wp_relay", "el_relay"):
+            if relay in pv and pv[relay] not in seen:
+                errors.append(f"pv {relay} '{pv[relay]}' is not a register key")
+
+    if errors:
+        raise ProfileError(f"Invalid EcoDesign profile '{model}': " + "; ".join(errors))
+
+    defaults = (profile["write_limits"]["min_interval"], profile["write_limits"]["daily_budget"])
+    write_limits = {
+        word: (
+            reg.min_write_interval if reg.min_write_interval is not None else defaults[0],
+            reg.daily_write_budget if reg.daily_write_budget is not None else defaults[1],
+        )
+        for reg in writable.values()
+        for word in range(reg.address, reg.address + reg.words)
+    }
+
+    return CompiledProfile(
+        model=model,
+        device={"manufacturer": profile["device"].get("manufacturer"), "model": profile["device"].get("model")},
+        registers=registers,
+        registers_by_slot=by_slot,
+        slot_polls={
+            slot: min((reg.poll for reg in regs), key=POLL_CLASSES.index) for slot, regs in by_slot.items()
+        },
+        writable_by_key=writable,
+        burst_keys=frozenset(reg.key for regs in by_slot.values() for reg in regs if reg.burst_on_change),
+        history=history,
+        pv=pv,
+        write_limits=write_limits,
+        default_write_limits=defaults,
+    )
+
+
+# (profile path, mtime_ns) -> compiled profile; an edited file gets a new key.
+_CACHE: dict[tuple[str, int], CompiledProfile] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def load_profile(model: str, profile_dir: Path = PROFILE_DIR) -> CompiledProfile:
+    """Load, validate and compile ``<profile_dir>/<model>.json``, using the cache when fresh.
+
+    Blocking (stat + file I/O on a miss) – call it from an executor.
+    """
+
+    path = profile_dir / f"{model.lower()}.json"
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise ProfileError(f"Unknown EcoDesign profile '{model}' ({path})") from None
+
+    key = (str(path), mtime)
+    with _CACHE_LOCK:
+        compiled = _CACHE.get(key)
+        if compiled is not None:
+            return compiled
+
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+        except ValueError as err:
+            raise ProfileError(f"EcoDesign profile '{model}' is not valid JSON: {err}") from err
+        compiled = compile_profile(model, raw)
+        _LOGGER.debug("Compiled profile %s (%s read slots)", path.name, len(compiled.slot_polls))
+        # Drop older versions of the same file.
+        for stale in [k for k in _CACHE if k[0] == key[0]]:
+            del _CACHE[stale]
+        _CACHE[key] = compiled
+        return compiled
+
+
+async def async_load_profile(hass: HomeAssistant, model: str) -> CompiledProfile:
+    """Load a compiled profile without blocking the event loop."""
+
+    return await hass.async_add_executor_job(load_profile, model)
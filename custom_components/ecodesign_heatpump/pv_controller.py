@@ -0,0 +1,205 @@
+"""Closed-loop PV-surplus control of the Smart-Grid/PV mode.
+
+Replaces the usual template + automation setup that writes ``pv_mode`` on
+every power-meter update. The controller listens to a grid-power sensor,
+smooths it over a time window and maps the available surplus to a stage
+(off / heat pump / heat pump + heating rod) with hysteresis. It writes only
+when the stage changes and at most once per ``min_switch_interval``.
+
+"Available" surplus is the smoothed export plus the nominal draw of the loads
+that currently run according to the coordinator's cached relay states. Without
+that, switching the compressor on would eat the export it was switched on for
+and the next evaluation would switch it off again.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Mapping
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_PV_EL_POWER,
+    CONF_PV_EXPORT_POSITIVE,
+    CONF_PV_GRID_ENTITY,
+    CONF_PV_HYSTERESIS,
+    CONF_PV_MIN_SWITCH_INTERVAL,
+    CONF_PV_WINDOW,
+    CONF_PV_WP_POWER,
+    DEFAULT_PV_EL_POWER,
+    DEFAULT_PV_EXPORT_POSITIVE,
+    DEFAULT_PV_HYSTERESIS,
+    DEFAULT_PV_MIN_SWITCH_INTERVAL,
+    DEFAULT_PV_WINDOW,
+    DEFAULT_PV_WP_POWER,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import ED300Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stages in ascending power order; the names are the keys of the profile's pv "modes".
+STAGES = ("off", "wp", "both")
+
+
+class TimeWindow:
+    """Time-weighted mean of irregular samples over the last ``seconds``."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self._samples: deque[tuple[float, float]] = deque()
+
+    def add(self, timestamp: float, value: float) -> None:
+        self._samples.append((timestamp, value))
+        # Keep one sample from before the window start: it holds until its successor.
+        while len(self._samples) > 1 and self._samples[1][0] <= timestamp - self.seconds:
+            self._samples.popleft()
+
+    def coverage(self, now: float) -> float:
+        return now - self._samples[0][0] if self._samples else 0.0
+
+    def mean(self, now: float) -> float | None:
+        if not self._samples:
+            return None
+        start = now - self.seconds
+        area = span = 0.0
+        samples = list(self._samples)
+        for (t, value), (t_next, _) in zip(samples, [*samples[1:], (now, 0.0)]):
+            held = t_next - max(t, start)
+            if held > 0:
+                area += value * held
+                span += held
+        return area / span if span > 0 else samples[-1][1]
+
+
+class PVSurplusController:
+    """Drive the profile's PV mode select from a grid-power sensor."""
+
+    def __init__(self, hass: HomeAssistant, coordinator: ED300Coordinator, config: Mapping[str, Any]) -> None:
+        pv: dict[str, Any] = coordinator.profile.pv or {}
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entity_id: str = config[CONF_PV_GRID_ENTITY]
+        self.export_positive = bool(config.get(CONF_PV_EXPORT_POSITIVE, DEFAULT_PV_EXPORT_POSITIVE))
+        self.hysteresis = float(config.get(CONF_PV_HYSTERESIS, DEFAULT_PV_HYSTERESIS))
+        self.min_switch_interval = float(config.get(CONF_PV_MIN_SWITCH_INTERVAL, DEFAULT_PV_MIN_SWITCH_INTERVAL))
+        self.window = TimeWindow(float(config.get(CONF_PV_WINDOW, DEFAULT_PV_WINDOW)))
+        wp_power = float(config.get(CONF_PV_WP_POWER, DEFAULT_PV_WP_POWER))
+        el_power = float(config.get(CONF_PV_EL_POWER, DEFAULT_PV_EL_POWER))
+        self._draw = [(key, power) for key, power in ((pv.get("wp_relay"), wp_power), (pv.get("el_relay"), el_power)) if key]
+
+        self._mode = coordinator.profile.writable_by_key[pv["mode_key"]]
+        # Surplus that has to be available for each stage, and its register code.
+        self._needs = dict(zip(STAGES, (0.0, wp_power, wp_power + el_power)))
+        self._codes = {stage: self._mode.code_by_option[pv["modes"][stage]] for stage in STAGES}
+
+        self._last_switch: float | None = None
+        self._writing = False
+        self.surplus: float | None = None
+        self.available: float | None = None
+        self.target: str | None = None
+        self.writes = 0
+        self.held_back = 0  # stage changes deferred by min_switch_interval
+        self.last_error: str | None = None
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Subscribe to the grid sensor and the coordinator; returns the unsubscribe callback."""
+
+        unsubs = [
+            async_track_state_change_event(self.hass, [self.entity_id], self._async_grid_changed),
+            # A steady sensor fires no state changes; re-evaluate on every poll so the window still advances.
+            self.coordinator.async_add_listener(self._async_polled),
+        ]
+
+        @callback
+        def _unsub() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return _unsub
+
+    @callback
+    def _async_polled(self) -> None:
+        self._evaluate(time.monotonic())
+
+    @callback
+    def _async_grid_changed(self, event: Event) -> None:
+        state = event.data.get("new_state")
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return
+        try:
+            power = float(state.state)
+        except ValueError:
+            return
+        if state.attributes.get("unit_of_measurement") == UnitOfPower.KILO_WATT:
+            power *= 1000
+        now = time.monotonic()
+        self.window.add(now, power if self.export_positive else -power)
+        self._evaluate(now)
+
+    def _stage(self, code: Any) -> str:
+        return next((stage for stage, value in self._codes.items() if value == code), "off")
+
+    def _evaluate(self, now: float) -> None:
+        # Half a window of data before the first decision, so a single spike cannot switch.
+        if self.window.coverage(now) < self.window.seconds / 2:
+            return
+        self.surplus = self.window.mean(now)
+        data = self.coordinator.data or {}
+        if self.surplus is None or data.get(self._mode.key) is None:
+            return
+        self.available = self.surplus + sum(power for key, power in self._draw if data.get(key))
+
+        current = self._stage(data[self._mode.key])
+        index = STAGES.index(current)
+        # Step up once a stage is fully covered, step down only below its need minus the hysteresis.
+        while index + 1 < len(STAGES) and self.available >= self._needs[STAGES[index + 1]]:
+            index += 1
+        while index > 0 and self.available < self._needs[STAGES[index]] - self.hysteresis:
+            index -= 1
+        self.target = STAGES[index]
+        if self.target == current or self._writing:
+            return
+        if self._last_switch is not None and now - self._last_switch < self.min_switch_interval:
+            self.held_back += 1
+            return
+        self._last_switch = now
+        self._writing = True
+        self.coordinator.entry.async_create_background_task(
+            self.hass, self._async_switch(self.target), f"ecodesign_heatpump pv switch {self.target}"
+        )
+
+    async def _async_switch(self, stage: str) -> None:
+        _LOGGER.debug("PV surplus %.0f W (available %.0f W): switching to %s", self.surplus, self.available, stage)
+        try:
+            await self.coordinator.async_write_registers({self._mode.key: self._codes[stage]})
+        except Exception as err:  # noqa: BLE001
+            # Guard refusals and link errors: try again at the next evaluation after the interval.
+            self.last_error = str(err)
+            _LOGGER.warning("PV controller could not set %s to %s: %s", self._mode.key, stage, err)
+        else:
+            self.writes += 1
+            self.last_error = None
+        finally:
+            self._writing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """State for diagnostics."""
+
+        return {
+            "grid_entity": self.entity_id,
+            "surplus_w": round(self.surplus) if self.surplus is not None else None,
+            "available_w": round(self.available) if self.available is not None else None,
+            "target": self.target,
+            "writes": self.writes,
+            "held_back": self.held_back,
+            "last_switch_age_s": round(time.monotonic() - self._last_switch) if self._last_switch else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,221 @@
+"""High-rate sampling of selected registers into long-term statistics.
+
+Compressor diagnostics want ``ww_temp``/``evap_temp``/``fan_0_10v`` every few
+seconds, but a state write per sample and entity makes the recorder database
+grow fast. The sampler reads the planned blocks holding the selected registers
+every ``interval`` seconds and folds each value into a running min/max/mean
+for the current hour. The coordinator decodes those blocks from the newest
+sample and holds only the selected keys to ``publish_interval``. Completed
+hours are imported in one batch per register as external statistics
+(``ecodesign_heatpump:<host>_<unit>_<key>``), which is what the recorder
+stores per hour anyway.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .connection import ModbusLinkError
+from .const import DOMAIN
+from .profile import ReadBlock, RegisterDef
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class _Hour:
+    start: datetime  # UTC, full hour
+    count: int
+    total: float
+    min: float
+    max: float
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_state(self) -> list[Any]:
+        return [self.start.isoformat(), self.count, self.total, self.min, self.max]
+
+
+class HighRateSampler:
+    """Sample the blocks of ``keys`` between polls and aggregate them per hour."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        object_prefix: str,
+        plan: list[ReadBlock],
+        keys: Iterable[str],
+        read: Callable[[ReadBlock], Awaitable[list[int | None]]],
+        decode: Callable[[ReadBlock, list[int | None]], Mapping[str, Any]],
+        interval: float,
+        publish_interval: float,
+    ) -> None:
+        self.hass = hass
+        self.name = name
+        self._prefix = slugify(object_prefix)
+        self._read = read
+        self._decode = decode
+        self.interval = interval
+        self.publish_interval = publish_interval
+        wanted = set(keys)
+        self._regs: dict[str, RegisterDef] = {}
+        # Plan index -> block; the coordinator publishes these from the samples.
+        self.blocks: dict[int, ReadBlock] = {}
+        for index, block in enumerate(plan):
+            for _, _, regs in block.fields:
+                for reg in regs:
+                    if reg.key in wanted:
+                        self._regs[reg.key] = reg
+                        self.blocks[index] = block
+        self._key_set = frozenset(self._regs)
+        self._words: dict[int, list[int | None]] = {}
+        self._hours: dict[str, _Hour] = {}
+        self._busy = False
+        self.samples = 0
+        self.failed = 0
+        self.overrun = 0  # ticks skipped because the previous sample was still on the bus
+        self.imported_hours = 0
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._regs)
+
+    @property
+    def key_set(self) -> frozenset[str]:
+        """Registers held back to the publish interval."""
+
+        return self._key_set
+
+    def statistic_id(self, key: str) -> str:
+        return f"{DOMAIN}:{self._prefix}_{slugify(key)}"
+
+    def words(self, index: int) -> list[int | None] | None:
+        """Newest sampled words of a plan block; None until it was sampled once."""
+
+        return self._words.get(index)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start sampling; returns the callback that stops it."""
+
+        return async_track_time_interval(
+            self.hass, self._async_sample, timedelta(seconds=self.interval), name=f"{self.name} sampling"
+        )
+
+    async def _async_sample(self, _now: Any = None) -> None:
+        if self._busy:
+            self.overrun += 1
+            return
+        self._busy = True
+        try:
+            values: dict[str, Any] = {}
+            for index, block in self.blocks.items():
+                words = await self._read(block)
+                self._words[index] = words
+                values.update(self._decode(block, words))
+        except ModbusLinkError as err:
+            # The regular poll reports the link; drop the stale words so it reads the block itself.
+            self.failed += 1
+            self._words.clear()
+            _LOGGER.debug("Sampling %s failed: %s", self.name, err)
+            return
+        finally:
+            self._busy = False
+        self.samples += 1
+        self._aggregate(dt_util.utcnow(), values)
+
+    def _aggregate(self, now: datetime, values: Mapping[str, Any]) -> None:
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        completed: dict[str, list[_Hour]] = {}
+        for key in self._regs:
+            value = values.get(key)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            current = self._hours.get(key)
+            if current is not None and current.start != hour:
+                completed.setdefault(key, []).append(current)
+                current = None
+            if current is None:
+                self._hours[key] = _Hour(hour, 1, float(value), float(value), float(value))
+            else:
+                current.add(float(value))
+        if completed:
+            self._async_import(completed)
+
+    @callback
+    def _async_import(self, completed: Mapping[str, list[_Hour]]) -> None:
+        if "recorder" not in self.hass.config.components:
+            return
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        try:  # recorder >= 2025.4 wants the mean type spelled out
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:
+            mean_type = None
+        else:
+            mean_type = StatisticMeanType.ARITHMETIC
+
+        for key, hours in completed.items():
+            reg = self._regs[key]
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self.name} {reg.name}",
+                source=DOMAIN,
+                statistic_id=self.statistic_id(key),
+                unit_of_measurement=reg.unit,
+            )
+            if mean_type is not None:
+                metadata["mean_type"] = mean_type
+            async_add_external_statistics(
+                self.hass,
+                metadata,
+                [StatisticData(start=h.start, mean=h.total / h.count, min=h.min, max=h.max) for h in hours],
+            )
+            self.imported_hours += len(hours)
+
+    def as_state(self) -> dict[str, list[Any]]:
+        """The running hour, persisted so a restart does not cut it short."""
+
+        return {key: hour.as_state() for key, hour in self._hours.items()}
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        for key, value in state.items():
+            if key not in self._regs or not isinstance(value, list) or len(value) != 5:
+                continue
+            start = dt_util.parse_datetime(str(value[0]))
+            if start is not None:
+                # An hour that ended meanwhile is imported with the next sample.
+                self._hours[key] = _Hour(start, int(value[1]), float(value[2]), float(value[3]), float(value[4]))
+
+    def as_dict(self) -> dict[str, Any]:
+        """State for diagnostics."""
+
+        return {
+            "keys": self.keys,
+            "interval_s": self.interval,
+            "publish_interval_s": self.publish_interval,
+            "blocks": [f"{block.reg_type}@{block.address}+{block.count}" for block in self.blocks.values()],
+            "samples": self.samples,
+            "failed": self.failed,
+            "overrun": self.overrun,
+            "imported_hours": self.imported_hours,
+            "current_hour": {
+                key: {"samples": h.count, "min": h.min, "max": h.max, "mean": round(h.total / h.count, 3)}
+                for key, h in self._hours.items()
+            },
+        }
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from dataclasses import dataclass
+from typing import Any, Callable
 
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+
+from .connection import LINK_BACKOFF, LINK_CONNECTED, LINK_DISCONNECTED
 from .const import DOMAIN
-from .coordinator import ED300Coordinator, RegisterDef
+from .coordinator import ED300Coordinator
+from .entity import ED300Entity
+from .profile import RegisterDef
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator: ED300Coordinator = hass.data[DOMAIN][entry.entry_id]
@@ -12,23 +23,154 @@ async def async_setup_entry(hass, entry, async_add_entities):
     for r in coordinator.registers.get("sensors", []):
         entities.append(ED300Sensor(coordinator, r))
     async_add_entities(entities)
+    async_add_entities(
+        ED300HistorySensor(coordinator, description)
+        for description in _history_descriptions(coordinator.profile.history)
+    )
+    async_add_entities(ED300DiagnosticSensor(coordinator, description) for description in DIAGNOSTIC_SENSORS)
 
-class ED300Sensor(CoordinatorEntity[ED300Coordinator], SensorEntity):
-    _attr_has_entity_name = True
-
+class ED300Sensor(ED300Entity, SensorEntity):
     def __init__(self, coordinator: ED300Coordinator, reg: RegisterDef) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, (reg.key,))
         self.reg = reg
         self._attr_name = reg.name
         self._attr_unique_id = f"{coordinator.host}-{coordinator.unit_id}-sensor-{reg.key}"
         self._attr_native_unit_of_measurement = reg.unit
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, f"{coordinator.host}:{coordinator.unit_id}")},
-            "manufacturer": coordinator.device["manufacturer"],
-            "model": coordinator.device["model"],
-            "name": "EcoDesign ED300",
-        }
 
     @property
     def native_value(self):
-        return self.coordinator.data.get(self.reg.key)
+        return self._value(self.reg.key)
+
+    @property
+    def extra_state_attributes(self):
+        # Named bits of bitfield registers (e.g. status_bits), decoded by the coordinator.
+        if not self.reg.bits:
+            return None
+        return {name: self._value(bit_key) for (name, _), (bit_key, _) in zip(self.reg.bits, self.reg.bit_keys)}
+
+@dataclass(frozen=True, kw_only=True)
+class ED300DiagnosticSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[ED300Coordinator], Any]
+    attrs_fn: Callable[[ED300Coordinator], dict[str, Any]] | None = None
+    # Reports on the link/polling itself, so stays available while polls fail.
+    always_available: bool = False
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+DIAGNOSTIC_SENSORS: tuple[ED300DiagnosticSensorDescription, ...] = (
+    ED300DiagnosticSensorDescription(
+        key="link_state",
+        name="Modbus-Verbindung",
+        device_class=SensorDeviceClass.ENUM,
+        options=[LINK_CONNECTED, LINK_BACKOFF, LINK_DISCONNECTED],
+        value_fn=lambda c: c.connection.state,
+        attrs_fn=lambda c: {"failures": c.connection.failures, "last_error": c.connection.last_error},
+        always_available=True,
+    ),
+    ED300DiagnosticSensorDescription(
+        key="link_latency",
+        name="Modbus-Latenz",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        value_fn=lambda c: _ms(c.connection.latency),
+    ),
+    ED300DiagnosticSensorDescription(
+        key="poll_duration",
+        name="Abfragedauer",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        value_fn=lambda c: _ms(c.stats.last_duration),
+    ),
+    ED300DiagnosticSensorDescription(
+        key="poll_requests",
+        name="Modbus-Anfragen pro Abfrage",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda c: c.stats.last_requests,
+        attrs_fn=lambda c: {"polls": c.stats.polls, "failed_polls": c.stats.failed_polls},
+    ),
+    ED300DiagnosticSensorDescription(
+        key="last_success",
+        name="Letzte erfolgreiche Abfrage",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda c: c.stats.last_success,
+        always_available=True,
+    ),
+)
+
+class ED300DiagnosticSensor(ED300Entity, SensorEntity):
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    entity_description: ED300DiagnosticSensorDescription
+
+    def __init__(self, coordinator: ED300Coordinator, description: ED300DiagnosticSensorDescription) -> None:
+        super().__init__(coordinator, None)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}-{coordinator.unit_id}-diag-{description.key}"
+
+    @property
+    def available(self) -> bool:
+        return self.entity_description.always_available or super().available
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self):
+        if self.entity_description.attrs_fn is None:
+            return None
+        return self.entity_description.attrs_fn(self.coordinator)
+
+def _history_descriptions(history: dict[str, Any]) -> list[SensorEntityDescription]:
+    """Sensors for the statistics the coordinator derives from its sample history."""
+
+    descriptions: list[SensorEntityDescription] = []
+    for item in history.get("runtime", []):
+        name = item.get("name", item["key"])
+        descriptions += [
+            SensorEntityDescription(
+                key=f"{item['key']}_runtime",
+                name=f"Laufzeit {name}",
+                device_class=SensorDeviceClass.DURATION,
+                state_class=SensorStateClass.TOTAL_INCREASING,
+                native_unit_of_measurement=UnitOfTime.HOURS,
+                suggested_display_precision=1,
+            ),
+            SensorEntityDescription(
+                key=f"{item['key']}_cycles",
+                name=f"Schaltzyklen {name}",
+                state_class=SensorStateClass.TOTAL_INCREASING,
+            ),
+            SensorEntityDescription(
+                key=f"{item['key']}_duty_cycle",
+                name=f"Einschaltanteil {name}",
+                state_class=SensorStateClass.MEASUREMENT,
+                native_unit_of_measurement=PERCENTAGE,
+            ),
+        ]
+    for item in history.get("rate", []):
+        descriptions.append(
+            SensorEntityDescription(
+                key=item["key"],
+                name=item.get("name", item["key"]),
+                state_class=SensorStateClass.MEASUREMENT,
+                native_unit_of_measurement=item.get("unit"),
+            )
+        )
+    return descriptions
+
+class ED300HistorySensor(ED300Entity, SensorEntity):
+    """Runtime, cycle, duty-cycle and rate statistics derived by the coordinator."""
+
+    def __init__(self, coordinator: ED300Coordinator, description: SensorEntityDescription) -> None:
+        super().__init__(coordinator, (description.key,))
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.host}-{coordinator.unit_id}-history-{description.key}"
+
+    @property
+    def native_value(self):
+        return self._value(self.entity_description.key)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Iterable
+
+from homeassistant.util import dt as dt_util
+
+# Upper bounds (ms) of the block round-trip histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class PollStats:
+    """Counters and timings of the coordinator's Modbus traffic."""
+
+    def __init__(self) -> None:
+        self.polls = 0
+        self.failed_polls = 0
+        self.last_duration: float | None = None  # seconds
+        self.last_requests: int | None = None
+        self.last_success: datetime | None = None
+        # block label ("input@7+9") -> request count per latency bucket
+        self.block_latency: dict[str, list[int]] = {}
+        self.register_errors: dict[str, int] = {}
+
+    def record_block(self, label: str, seconds: float) -> None:
+        buckets = self.block_latency.setdefault(label, [0] * (len(LATENCY_BUCKETS_MS) + 1))
+        ms = seconds * 1000
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                buckets[index] += 1
+                break
+        else:
+            buckets[-1] += 1
+
+    def record_errors(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.register_errors[key] = self.register_errors.get(key, 0) + 1
+
+    def record_poll(self, duration: float, requests: int, success: bool) -> None:
+        self.polls += 1
+        self.last_duration = duration
+        self.last_requests = requests
+        if success:
+            self.last_success = dt_util.utcnow()
+        else:
+            self.failed_polls += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "polls": self.polls,
+            "failed_polls": self.failed_polls,
+            "last_duration_ms": round(self.last_duration * 1000, 1) if self.last_duration is not None else None,
+            "last_requests": self.last_requests,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "block_latency": {
+                block: dict(zip(labels, counts)) for block, counts in self.block_latency.items()
+            },
+            "register_errors": dict(self.register_errors),
+        }
@@ -0,0 +1,355 @@
+"""Bus trace: record what the gateway actually answered and replay it offline.
+
+A :class:`BusTrace` attached to a :class:`ModbusConnection` gets one record per
+request that went on the wire, as a compact JSON line::
+
+    {"t":1730000000.123,"u":3,"fc":4,"a":0,"n":31,"ms":42.1,"r":[215,198,...]}
+
+``t`` is the wall-clock time the answer arrived, ``u`` the unit id, ``fc`` the
+Modbus function, ``a`` the start address, ``n`` the word count of a read and
+``w`` the words of a write. ``ms`` is the round trip. ``r`` holds the words of
+a successful read, ``x`` the exception code of an error response and ``e`` a
+link error (timeout, connection lost). Every file starts with a header line
+``{"trace":1,"link":...,"transport":...,"started":...}`` and is rotated like a
+log file (``.1`` is the previous one).
+
+:class:`ReplayConnection` feeds such a recording to ``ED300Coordinator`` in
+place of the real connection, at the recorded latencies or faster
+(``scripts/benchmark_coordinator.py --replay``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable, Mapping
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .connection import LINK_CONNECTED, ModbusLinkError
+from .const import (
+    DOMAIN,
+    PRIORITY_BACKGROUND,
+    PRIORITY_WRITE,
+    TRACE_BACKUPS,
+    TRACE_FLUSH_INTERVAL,
+    TRACE_FLUSH_LINES,
+    TRACE_MAX_BYTES,
+    TRANSPORT_TCP,
+)
+
+if TYPE_CHECKING:
+    from .connection import ModbusConnection
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_FORMAT = 1
+
+# Exception code recorded for error responses that do not carry one.
+_SLAVE_FAILURE = 4
+
+
+class BusTrace:
+    """Append-only, size-rotated JSON-lines recorder for one link.
+
+    Records are buffered on the event loop and written in the executor every
+    ``TRACE_FLUSH_LINES`` records or ``TRACE_FLUSH_INTERVAL`` seconds, so
+    tracing never blocks a request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        link: str,
+        transport: str,
+        max_bytes: int = TRACE_MAX_BYTES,
+        backups: int = TRACE_BACKUPS,
+    ) -> None:
+        self.hass = hass
+        self.path = path
+        self.link = link
+        self.transport = transport
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.users = 0  # entries on this link that enabled tracing
+        self._buffer: list[str] = []
+        self._lock = asyncio.Lock()
+        self._unsub: CALLBACK_TYPE | None = None
+        self._size: int | None = None  # current file size; read on the first flush
+        self.records = 0
+        self.rotations = 0
+        self.last_error: str | None = None
+
+    def record(
+        self,
+        request: Mapping[str, Any],
+        elapsed: float,
+        response: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Buffer one request with its response or error (called on the event loop)."""
+
+        entry: dict[str, Any] = {"t": round(time.time(), 3), **request, "ms": round(elapsed * 1000, 1)}
+        if error is not None:
+            entry["e"] = str(error) or type(error).__name__
+        elif response.isError():
+            entry["x"] = getattr(response, "exception_code", None) or _SLAVE_FAILURE
+        elif "n" in request:
+            entry["r"] = list(response.registers)
+        self._buffer.append(json.dumps(entry, separators=(",", ":")))
+        self.records += 1
+        if len(self._buffer) >= TRACE_FLUSH_LINES:
+            self.hass.async_create_background_task(self.async_flush(), f"{DOMAIN} bus trace flush")
+        elif self._unsub is None:
+            self._unsub = async_call_later(self.hass, TRACE_FLUSH_INTERVAL, self._async_timer)
+
+    async def _async_timer(self, _now: Any = None) -> None:
+        self._unsub = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the buffered records; one flush at a time keeps them in order."""
+
+        async with self._lock:
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            try:
+                await self.hass.async_add_executor_job(self._write, lines)
+            except OSError as err:
+                self.last_error = str(err)
+                _LOGGER.warning("Cannot write bus trace %s: %s", self.path, err)
+
+    async def async_close(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self.async_flush()
+
+    def _write(self, lines: list[str]) -> None:
+        data = "".join(f"{line}\n" for line in lines)
+        if self._size is None:
+            self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as handle:
+            if not self._size:
+                header = json.dumps(
+                    {
+                        "trace": TRACE_FORMAT,
+                        "link": self.link,
+                        "transport": self.transport,
+                        "started": dt_util.utcnow().isoformat(),
+                    },
+                    separators=(",", ":"),
+                )
+                handle.write(f"{header}\n")
+                self._size = len(header) + 1
+            handle.write(data)
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        # trace.jsonl -> trace.jsonl.1 -> ... -> trace.jsonl.<backups>, the oldest is dropped.
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._size = 0
+        self.rotations += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """State for diagnostics."""
+
+        return {
+            "path": self.path,
+            "records": self.records,
+            "buffered": len(self._buffer),
+            "file_bytes": self._size,
+            "rotations": self.rotations,
+            "last_error": self.last_error,
+        }
+
+
+def async_attach_trace(hass: HomeAssistant, connection: ModbusConnection) -> BusTrace:
+    """Start (or join) tracing on a shared connection; one file per link."""
+
+    trace = connection.trace
+    if trace is None:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", connection.label).strip("_")
+        path = hass.config.path(f"{DOMAIN}_trace_{slug}.jsonl")
+        trace = connection.trace = BusTrace(hass, path, connection.label, connection.transport)
+        _LOGGER.info("Recording Modbus traffic on %s to %s", connection.label, path)
+    trace.users += 1
+    return trace
+
+
+async def async_detach_trace(connection: ModbusConnection) -> None:
+    """Leave tracing; the last entry on the link flushes and stops the recorder."""
+
+    trace = connection.trace
+    if trace is None:
+        return
+    trace.users -= 1
+    if trace.users > 0:
+        return
+    connection.trace = None
+    await trace.async_close()
+
+
+def load_trace(paths: Iterable[str | os.PathLike[str]]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Read trace files (oldest first) into the first header and all records."""
+
+    header: dict[str, Any] = {}
+    records: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "trace" in entry:
+                    if entry["trace"] != TRACE_FORMAT:
+                        raise ValueError(f"{path}: unsupported trace format {entry['trace']}")
+                    header = header or entry
+                else:
+                    records.append(entry)
+    return header, records
+
+
+@dataclass(slots=True)
+class ReplayResponse:
+    """The parts of a pymodbus response the integration looks at."""
+
+    registers: list[int]
+    exception_code: int | None = None
+
+    def isError(self) -> bool:  # noqa: N802 - pymodbus API
+        return self.exception_code is not None
+
+
+class ReplayConnection:
+    """Serves a recorded trace in place of :class:`ModbusConnection`.
+
+    Requests are matched by unit, function, address and word count and get the
+    recorded answers for that request in recorded order. Once those are used
+    up the last one repeats, so a coordinator may poll more often than the
+    recording did. ``speed`` divides the recorded round trips (0 = no waiting).
+    A request the trace never saw fails like a dead link.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Mapping[str, Any]],
+        host: str = "replay",
+        port: int = 0,
+        transport: str = TRANSPORT_TCP,
+        speed: float = 1.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.transport = transport
+        self.speed = speed
+        self.frame_delay = 0.0
+        self.users = 0
+        self.trace: BusTrace | None = None
+        self._answers: dict[tuple[int, int, int, int], deque[Mapping[str, Any]]] = {}
+        for record in records:
+            self._answers.setdefault(_key(record), deque()).append(record)
+        self._last: dict[tuple[int, int, int, int], Mapping[str, Any]] = {}
+        # One request at a time, like the bus.
+        self._bus = asyncio.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.latency: float | None = None
+        self.unit_failures: dict[int, int] = {}
+        self.served = 0
+        self.repeated = 0
+        self.missed = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.host} (replay)"
+
+    @property
+    def state(self) -> str:
+        return LINK_CONNECTED
+
+    @property
+    def queued(self) -> int:
+        return 0
+
+    @property
+    def remaining(self) -> int:
+        """Recorded answers not served yet."""
+
+        return sum(len(answers) for answers in self._answers.values())
+
+    async def async_read(
+        self, reg_type: str, address: int, count: int, unit: int, priority: int = PRIORITY_BACKGROUND
+    ) -> list[int] | None:
+        rr = await self.async_read_response(reg_type, address, count, unit, priority)
+        if rr.isError():
+            return None
+        return list(rr.registers)
+
+    async def async_read_response(
+        self, reg_type: str, address: int, count: int, unit: int, priority: int = PRIORITY_BACKGROUND
+    ) -> ReplayResponse:
+        return await self._async_answer((unit, 4 if reg_type == "input" else 3, address, count))
+
+    async def async_write(
+        self, address: int, words: list[int], unit: int, priority: int = PRIORITY_WRITE
+    ) -> ReplayResponse:
+        return await self._async_answer((unit, 6 if len(words) == 1 else 16, address, len(words)))
+
+    async def _async_answer(self, key: tuple[int, int, int, int]) -> ReplayResponse:
+        answers = self._answers.get(key)
+        if answers:
+            record = self._last[key] = answers.popleft()
+            self.served += 1
+        elif key in self._last:
+            record = self._last[key]
+            self.repeated += 1
+        else:
+            self.missed += 1
+            self.failures += 1
+            self.last_error = "unit {} fc {} @{}+{} is not in the trace".format(*key)
+            raise ModbusLinkError(self.last_error)
+
+        async with self._bus:
+            self.requests += 1
+            if self.speed:
+                await asyncio.sleep(record["ms"] / 1000 / self.speed)
+        if "e" in record:
+            self.failures += 1
+            self.last_error = record["e"]
+            raise ModbusLinkError(record["e"])
+        self.failures = 0
+        self.latency = record["ms"] / 1000
+        return ReplayResponse(list(record.get("r", ())), record.get("x"))
+
+    def reset_backoff(self, unit: int | None = None) -> None:
+        self.failures = 0
+        self.last_error = None
+
+    async def async_close(self) -> None:
+        return None
+
+
+def _key(record: Mapping[str, Any]) -> tuple[int, int, int, int]:
+    count = record["n"] if "n" in record else len(record["w"])
+    return int(record["u"]), int(record["fc"]), int(record["a"]), int(count)
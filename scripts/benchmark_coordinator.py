@@ -0,0 +1,365 @@
+"""Benchmark ED300Coordinator against the offline Modbus simulator.
+
+Runs the real coordinator (Home Assistant + pymodbus must be installed, e.g.
+``pip install homeassistant pymodbus``) against ``modbus_simulator.py`` on
+localhost and reports:
+
+* polls per second and wall time per poll (full sweeps: every block due),
+  optionally for several unit ids sharing one gateway connection (``--devices``),
+* Modbus requests per poll (coordinator side and as seen by the simulator),
+* write-to-confirm latency: from ``async_write_registers`` until the
+  simulator has served the read-back covering the written register.
+  With ``--write-during-poll`` each write is issued while a full sweep is in
+  flight, which shows how far writes overtake background polling.
+
+With ``--replay`` the coordinator is fed a bus trace recorded on a real
+installation (option *Record Modbus traffic*, files
+``ecodesign_heatpump_trace_<link>.jsonl[.N]``) instead of the simulator, one
+coordinator per recorded unit id, until the trace is used up. ``--speed``
+divides the recorded round trips (0 = as fast as possible). The report adds
+how many requests were answered from the trace and a digest of the decoded
+register values, which is stable across runs of the same trace.
+
+Usage:
+    python scripts/benchmark_coordinator.py --polls 50 --latency 0.03 --jitter 0.01
+    python scripts/benchmark_coordinator.py --json > bench_output.txt
+    python scripts/benchmark_coordinator.py --replay trace.jsonl.1 trace.jsonl --speed 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from modbus_simulator import DEFAULT_PROFILE, SimulatedED300, SimulatorConfig  # noqa: E402
+
+DEFAULT_POLLS = 30
+
+
+def _percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    return {
+        "mean_ms": round(1000 * sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(1000 * _percentile(values, 0.5), 2),
+        "p95_ms": round(1000 * _percentile(values, 0.95), 2),
+        "max_ms": round(1000 * max(values), 2) if values else 0.0,
+    }
+
+
+def _make_all_blocks_due(coordinator) -> None:
+    # Benchmark full sweeps regardless of the poll tiers.
+    coordinator._block_due = [0.0] * len(coordinator._block_due)
+
+
+async def _wait_for_read_back(simulator: SimulatedED300, since: float, address: int, timeout: float) -> float | None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for event in simulator.events:
+            if (
+                event.timestamp >= since
+                and event.ok
+                and event.function == 3
+                and event.address <= address < event.address + event.count
+            ):
+                return event.timestamp
+        await asyncio.sleep(0.005)
+    return None
+
+
+def _digest(coordinators) -> str:
+    # Register values only: the derived history statistics depend on wall time.
+    keys = {reg.key for reg in coordinators[0].profile.iter_registers()}
+    values = [{key: value for key, value in (device.data or {}).items() if key in keys} for device in coordinators]
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+async def replay(args: argparse.Namespace) -> dict:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.ecodesign_heatpump.const import DATA_CONNECTIONS
+    from custom_components.ecodesign_heatpump.coordinator import ED300Coordinator
+    from custom_components.ecodesign_heatpump.profile import load_profile
+    from custom_components.ecodesign_heatpump.trace import ReplayConnection, load_trace
+
+    header, records = load_trace(args.replay)
+    transport = header.get("transport", "tcp")
+    units = sorted({int(record["u"]) for record in records})
+    profile = load_profile(args.profile.stem, args.profile.parent)
+    # Block limits of the recording site; without them the read plan (and the requests) may differ.
+    options = {
+        key: value
+        for key, value in (("max_block_size", args.max_block_size), ("max_read_gap", args.max_read_gap))
+        if value is not None
+    }
+    data = {"device": "replay"} if transport == "serial" else {"host": "replay", "port": 0}
+    connection = ReplayConnection(
+        records, host="replay", port=0, transport=transport, speed=args.speed
+    )
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # Pre-seed the connection pool: the coordinators acquire the replay instead of a client.
+        hass.data[DATA_CONNECTIONS] = {(transport, "replay", 0): connection}
+        coordinators = [
+            ED300Coordinator(
+                hass,
+                SimpleNamespace(
+                    entry_id=f"replay-{unit}",
+                    title="replay",
+                    data={**data, "unit_id": unit, "transport": transport},
+                    options=options,
+                ),
+                profile,
+            )
+            for unit in units
+        ]
+
+        poll_times: list[float] = []
+        requests: list[int] = []
+        failed = polls = 0
+        started = time.monotonic()
+        # Full sweeps until every recorded answer was served (or --polls sweeps).
+        while connection.remaining and (args.polls is None or polls < args.polls):
+            before = connection.remaining
+            for device in coordinators:
+                _make_all_blocks_due(device)
+                t0 = time.monotonic()
+                await device.async_refresh()
+                poll_times.append(time.monotonic() - t0)
+                requests.append(device.stats.last_requests or 0)
+                failed += not device.last_update_success
+            polls += 1
+            if connection.remaining == before:
+                break  # the plan asks for nothing the trace still has
+        wall = time.monotonic() - started
+        digest = _digest(coordinators)
+
+        await hass.async_block_till_done()
+        for device in coordinators:
+            await device.async_close()
+        await hass.async_stop(force=True)
+
+    return {
+        "replay": {
+            "files": [str(path) for path in args.replay],
+            "link": header.get("link"),
+            "transport": transport,
+            "speed": args.speed,
+            "records": len(records),
+            "served": connection.served,
+            "repeated": connection.repeated,
+            "missed": connection.missed,
+            "left": connection.remaining,
+        },
+        "devices": len(coordinators),
+        "polls": polls,
+        "failed_polls": failed,
+        "polls_per_second": round(polls * len(coordinators) / wall, 2) if wall else None,
+        "poll_wall_time": _summary(poll_times),
+        "requests_per_poll": round(sum(requests) / len(requests), 2) if requests else 0,
+        "read_plan": [f"{b.reg_type}@{b.address}+{b.count} ({b.poll})" for b in coordinators[0].read_plan],
+        "data_digest": digest,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.ecodesign_heatpump.coordinator import ED300Coordinator
+    from custom_components.ecodesign_heatpump.profile import load_profile
+
+    simulator = SimulatedED300.from_file(
+        args.profile,
+        SimulatorConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            drop_rate=args.drop,
+            drift_interval=args.drift_interval,
+            strict=args.strict,
+            # A single device only answers its own unit id, which checks it is sent.
+            unit_id=args.unit if args.devices == 1 else None,
+            seed=args.seed,
+            framing="rtu" if args.transport == "rtu_over_tcp" else "tcp",
+        ),
+    )
+    port = await simulator.start("127.0.0.1", 0)
+    profile = load_profile(args.profile.stem, args.profile.parent)
+    polls = args.polls or DEFAULT_POLLS
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        # Several units behind one gateway share a single pooled connection.
+        coordinators = [
+            ED300Coordinator(
+                hass,
+                SimpleNamespace(
+                    entry_id=f"benchmark-{unit}",
+                    title="benchmark",
+                    data={"host": "127.0.0.1", "port": port, "unit_id": unit, "transport": args.transport},
+                    options={},
+                ),
+                profile,
+            )
+            for unit in range(args.unit, args.unit + args.devices)
+        ]
+        coordinator = coordinators[0]
+
+        async def _poll(device) -> tuple[float, int, bool]:
+            _make_all_blocks_due(device)
+            t0 = time.monotonic()
+            await device.async_refresh()
+            return time.monotonic() - t0, device.stats.last_requests or 0, device.last_update_success
+
+        poll_times: list[float] = []
+        requests: list[int] = []
+        failed = 0
+        wire_before = simulator.requests
+        started = time.monotonic()
+        for _ in range(polls):
+            for elapsed, count, success in await asyncio.gather(*(_poll(device) for device in coordinators)):
+                poll_times.append(elapsed)
+                requests.append(count)
+                failed += not success
+        sweep_wall = time.monotonic() - started
+        wire_requests = simulator.requests - wire_before
+
+        write_reg = coordinator._writable_by_key[args.write_key]
+        low = write_reg.min_value if write_reg.min_value is not None else 0
+        acks: list[float] = []
+        confirms: list[float] = []
+        for index in range(args.writes):
+            sweep = None
+            if args.write_during_poll:
+                _make_all_blocks_due(coordinator)
+                sweep = asyncio.create_task(coordinator.async_refresh())
+                await asyncio.sleep(args.latency / 2)  # first block request is on the wire
+            t0 = time.monotonic()
+            await coordinator.async_write_registers({args.write_key: low + index % 5})
+            acks.append(time.monotonic() - t0)
+            if sweep is not None:
+                await sweep
+            confirmed = await _wait_for_read_back(simulator, t0, write_reg.address, timeout=15)
+            if confirmed is not None:
+                confirms.append(confirmed - t0)
+
+        await hass.async_block_till_done()
+        for device in coordinators:
+            await device.async_close()
+        await hass.async_stop(force=True)
+    await simulator.stop()
+
+    return {
+        "simulator": {
+            "latency_s": args.latency,
+            "jitter_s": args.jitter,
+            "drop_rate": args.drop,
+            "strict": args.strict,
+        },
+        "write_during_poll": args.write_during_poll,
+        "devices": args.devices,
+        "polls": polls,
+        "failed_polls": failed,
+        "polls_per_second": round(polls * args.devices / sweep_wall, 2) if sweep_wall else None,
+        "poll_wall_time": _summary(poll_times),
+        "requests_per_poll": round(sum(requests) / len(requests), 2) if requests else 0,
+        "wire_requests_per_poll": round(wire_requests / (polls * args.devices), 2),
+        "read_plan": [f"{b.reg_type}@{b.address}+{b.count} ({b.poll})" for b in coordinator.read_plan],
+        "writes": args.writes,
+        "write_ack": _summary(acks),
+        "write_to_confirm": _summary(confirms),
+        "unconfirmed_writes": args.writes - len(confirms),
+    }
+
+
+def _print_replay_report(result: dict) -> None:
+    rep = result["replay"]
+    print(f"replay: {', '.join(rep['files'])} ({rep['link']}, {rep['transport']}) at speed {rep['speed']}")
+    print(f"read plan: {', '.join(result['read_plan'])}")
+    print(
+        f"polls: {result['polls']} x {result['devices']} device(s) ({result['failed_polls']} failed), "
+        f"{result['polls_per_second']} polls/s"
+    )
+    s = result["poll_wall_time"]
+    print(f"   poll_wall_time: mean {s['mean_ms']} ms, p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms, max {s['max_ms']} ms")
+    print(
+        f"requests/poll: {result['requests_per_poll']}; trace records {rep['records']}: served {rep['served']}, "
+        f"repeated {rep['repeated']}, not in trace {rep['missed']}, left {rep['left']}"
+    )
+    print(f"data digest: {result['data_digest']}")
+
+
+def _print_report(result: dict) -> None:
+    sim = result["simulator"]
+    print(
+        f"simulator: latency={sim['latency_s']}s jitter={sim['jitter_s']}s "
+        f"drop={sim['drop_rate']} strict={sim['strict']}"
+    )
+    print(f"read plan: {', '.join(result['read_plan'])}")
+    print(
+        f"polls: {result['polls']} x {result['devices']} device(s) ({result['failed_polls']} failed), "
+        f"{result['polls_per_second']} polls/s"
+    )
+    for label in ("poll_wall_time", "write_ack", "write_to_confirm"):
+        s = result[label]
+        print(f"{label:>17}: mean {s['mean_ms']} ms, p50 {s['p50_ms']} ms, p95 {s['p95_ms']} ms, max {s['max_ms']} ms")
+    print(
+        f"requests/poll: {result['requests_per_poll']} (wire: {result['wire_requests_per_poll']}), "
+        f"unconfirmed writes: {result['unconfirmed_writes']}/{result['writes']}"
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", type=Path, default=DEFAULT_PROFILE)
+    parser.add_argument("--polls", type=int, default=None, help=f"default {DEFAULT_POLLS}; replay: until used up")
+    parser.add_argument("--writes", type=int, default=5)
+    parser.add_argument("--write-key", default="pv_wp")
+    parser.add_argument("--unit", type=int, default=3)
+    parser.add_argument("--devices", type=int, default=1, help="units behind the same gateway")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    parser.add_argument("--drift-interval", type=float, default=1.0)
+    parser.add_argument("--strict", action="store_true")
+    parser.add_argument("--transport", choices=("tcp", "rtu_over_tcp"), default="tcp")
+    parser.add_argument("--write-during-poll", action="store_true", help="issue each write during a full sweep")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replay", type=Path, nargs="+", help="bus trace file(s), oldest first, instead of the simulator")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed-up of the recorded round trips, 0 = none")
+    parser.add_argument("--max-block-size", type=int, help="replay: block size of the recording site")
+    parser.add_argument("--max-read-gap", type=int, help="replay: read gap of the recording site")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--debug", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    result = asyncio.run(replay(args) if args.replay else run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.replay:
+        _print_replay_report(result)
+    else:
+        _print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Scan an ED300-like device for mapped registers and write a draft profile.
+
+Sweeps input and holding registers in large blocks, bisects blocks the device
+rejects (illegal data address), samples the found registers a few times and
+classifies them as static / slow / fast. The result is a draft JSON profile
+with suggested poll tiers and the block layout; keys, names, scaling and
+entity types still need to be filled in by hand.
+
+Only pymodbus is required (``pip install pymodbus``).
+
+Usage:
+    python scripts/discover_registers.py 192.168.1.50 --unit 3 --output draft.json
+    python scripts/discover_registers.py 127.0.0.1 --port 5020 --input 0:64 --holding 0:64 --samples 3 --interval 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import inspect
+import json
+import sys
+from pathlib import Path
+
+from pymodbus.client import AsyncModbusTcpClient
+from pymodbus.exceptions import ModbusIOException
+
+# Load discovery.py directly: importing the package would pull in Home Assistant.
+_SPEC = importlib.util.spec_from_file_location(
+    "ed300_discovery",
+    Path(__file__).resolve().parent.parent / "custom_components" / "ecodesign_heatpump" / "discovery.py",
+)
+discovery = importlib.util.module_from_spec(_SPEC)
+sys.modules[_SPEC.name] = discovery  # dataclasses resolve annotations through sys.modules
+_SPEC.loader.exec_module(discovery)
+
+_UNIT_KWARG = (
+    "device_id"
+    if "device_id" in inspect.signature(AsyncModbusTcpClient.read_holding_registers).parameters
+    else "slave"
+)
+
+
+def _range(text: str) -> tuple[int, int]:
+    start, _, end = text.partition(":")
+    return int(start), int(end)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    client = AsyncModbusTcpClient(host=args.host, port=args.port, timeout=args.timeout, retries=1)
+    if not await client.connect():
+        raise SystemExit(f"cannot connect to {args.host}:{args.port}")
+
+    async def _read(reg_type: str, address: int, count: int) -> list[int] | None:
+        call = client.read_input_registers if reg_type == "input" else client.read_holding_registers
+        if not client.connected and not await client.connect():  # pymodbus drops the socket on a timeout
+            raise SystemExit(f"lost connection to {args.host}:{args.port}")
+        try:
+            response = await call(address=address, count=count, **{_UNIT_KWARG: args.unit})
+        except ModbusIOException as err:  # no answer within the timeout
+            raise asyncio.TimeoutError(str(err)) from err
+        return None if response.isError() else list(response.registers)
+
+    ranges = {}
+    if args.input:
+        ranges["input"] = args.input
+    if args.holding:
+        ranges["holding"] = args.holding
+    try:
+        result = await discovery.discover(
+            _read, ranges, block_size=args.block, samples=args.samples, interval=args.interval
+        )
+    finally:
+        client.close()
+    return discovery.draft_profile(result, args.model, args.block)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("host")
+    parser.add_argument("--port", type=int, default=502)
+    parser.add_argument("--unit", type=int, default=3)
+    parser.add_argument("--input", type=_range, default=(0, 256), help="input register range start:end")
+    parser.add_argument("--holding", type=_range, default=(0, 256), help="holding register range start:end")
+    parser.add_argument("--block", type=int, default=discovery.DEFAULT_BLOCK_SIZE, help="words per sweep request")
+    parser.add_argument("--samples", type=int, default=6)
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between samples")
+    parser.add_argument("--timeout", type=float, default=3.0)
+    parser.add_argument("--model", default="ED300 (discovered)")
+    parser.add_argument("--output", type=Path, help="write the draft profile here instead of stdout")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    profile = asyncio.run(run(args))
+    text = json.dumps(profile, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+        meta = profile["discovery"]
+        print(
+            f"{len(profile['registers']['sensors'])} registers in {meta['requests']} requests "
+            f"({meta['rejected']} rejected, {meta['timeouts']} of them timed out, {meta['duration_s']} s) -> {args.output}"
+        )
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Offline stand-in for an ED300 behind a Modbus TCP gateway.
+
+Serves the registers of a JSON profile (default: ``profiles/ed300.json``) over
+Modbus TCP with configurable per-request latency, jitter, dropped frames and
+slowly drifting sensor values. All connections share one simulated RS485 bus,
+so requests are answered strictly one after another like on the real device.
+
+Usage:
+    python scripts/modbus_simulator.py --port 5020 --latency 0.03 --jitter 0.01 --drop 0.01
+
+Supported function codes: 3 (read holding), 4 (read input), 6 (write single)
+and 16 (write multiple). With ``--strict`` reads touching addresses that are
+not in the profile answer with exception 2 (illegal data address), like
+firmwares that reject blocks spanning unmapped registers. ``--framing rtu``
+answers raw RTU frames (address, PDU, CRC) over the TCP socket instead, like a
+transparent RS485 bridge (``rtu_over_tcp`` transport).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+DEFAULT_PROFILE = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "ecodesign_heatpump"
+    / "profiles"
+    / "ed300.json"
+)
+
+EXC_ILLEGAL_FUNCTION = 1
+EXC_ILLEGAL_ADDRESS = 2
+EXC_ILLEGAL_VALUE = 3
+
+
+@dataclass
+class BusEvent:
+    """One request served by the simulator (for benchmarks)."""
+
+    timestamp: float
+    function: int
+    address: int
+    count: int
+    ok: bool  # False for exception responses
+
+
+@dataclass
+class SimulatorConfig:
+    latency: float = 0.0  # seconds per request
+    jitter: float = 0.0  # +/- seconds added uniformly
+    drop_rate: float = 0.0  # share of requests left unanswered
+    drift_interval: float = 5.0  # seconds between value drift steps, 0 = static
+    strict: bool = False
+    unit_id: int | None = None  # None = answer every unit id
+    seed: int | None = None
+    framing: str = "tcp"  # "tcp" (MBAP header) or "rtu" (address + PDU + CRC)
+    word_time: float = 0.0  # extra seconds per register read (serial line speed)
+    max_count: int = 125  # larger reads answer exception 3, like gateways with small buffers
+
+
+@dataclass
+class SimulatedED300:
+    """Register memory plus the Modbus TCP server around it."""
+
+    profile: dict
+    config: SimulatorConfig = field(default_factory=SimulatorConfig)
+
+    def __post_init__(self) -> None:
+        self.memory: dict[str, dict[int, int]] = {"input": {}, "holding": {}}
+        self._drifting: list[tuple[str, int]] = []
+        self._random = random.Random(self.config.seed)
+        self._bus = asyncio.Lock()
+        self.events: list[BusEvent] = []
+        self.requests = 0
+        self.dropped = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._drift_task: asyncio.Task | None = None
+        self._seed_memory()
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_PROFILE, config: SimulatorConfig | None = None) -> SimulatedED300:
+        with Path(path).open("r", encoding="utf-8") as handle:
+            return cls(json.load(handle), config or SimulatorConfig())
+
+    def _seed_memory(self) -> None:
+        registers = self.profile.get("registers", {})
+        for category in ("sensors", "numbers", "selects", "switches"):
+            for reg in registers.get(category, []):
+                reg_type = reg.get("register_type", "holding")
+                address = int(reg["address"])
+                if address in self.memory[reg_type]:
+                    continue
+                if reg.get("options"):
+                    value = int(reg["options"][0][1])
+                elif reg.get("min") is not None and reg.get("max") is not None:
+                    value = int((float(reg["min"]) + float(reg["max"])) / 2 / float(reg.get("scale") or 1))
+                elif reg.get("scale"):
+                    value = int(45 / float(reg["scale"]))  # a plausible temperature
+                else:
+                    value = 0
+                self.memory[reg_type][address] = value
+                if category == "sensors" and reg_type == "input":
+                    self._drifting.append((reg_type, address))
+
+    def drift(self) -> None:
+        """Random-walk sensor values; 0/1 registers (relays) occasionally toggle."""
+
+        for reg_type, address in self._drifting:
+            value = self.memory[reg_type][address]
+            if value in (0, 1):
+                if self._random.random() < 0.05:
+                    self.memory[reg_type][address] = 1 - value
+            else:
+                self.memory[reg_type][address] = max(0, min(0xFFFF, value + self._random.choice((-1, 0, 1))))
+
+    # ------------------------------------------------------------------ server
+
+    async def start(self, host: str = "127.0.0.1", port: int = 5020) -> int:
+        """Start serving; returns the bound port (pass 0 for an ephemeral one)."""
+
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        if self.config.drift_interval > 0:
+            self._drift_task = asyncio.create_task(self._drift_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._drift_task is not None:
+            self._drift_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _drift_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.drift_interval)
+            self.drift()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.config.framing == "rtu":
+            await self._handle_rtu(reader, writer)
+            return
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                response = await self._serve(unit, pdu)
+                if response is None:
+                    continue
+                writer.write(struct.pack(">HHHB", transaction, protocol, len(response) + 1, unit) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_rtu(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                unit, function = await reader.readexactly(2)
+                body = await reader.readexactly(5 if function == 16 else 4)
+                if function == 16:
+                    body += await reader.readexactly(body[4])
+                frame = bytes((unit, function)) + body
+                crc = await reader.readexactly(2)
+                if struct.unpack("<H", crc)[0] != _crc16(frame):
+                    continue  # corrupted frame: a real slave stays silent
+                response = await self._serve(unit, frame[1:])
+                if response is None:
+                    continue
+                reply = bytes((unit,)) + response
+                writer.write(reply + struct.pack("<H", _crc16(reply)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, unit: int, pdu: bytes) -> bytes | None:
+        async with self._bus:
+            cfg = self.config
+            delay = cfg.latency + self._random.uniform(-cfg.jitter, cfg.jitter)
+            if cfg.word_time and pdu[0] in (3, 4) and len(pdu) >= 5:
+                delay += cfg.word_time * struct.unpack(">H", pdu[3:5])[0]
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.requests += 1
+            if cfg.unit_id is not None and unit != cfg.unit_id:
+                return None  # nobody on the bus answers this address
+            if self._random.random() < cfg.drop_rate:
+                self.dropped += 1
+                return None
+            response = self._process(pdu)
+            if len(pdu) >= 5:
+                # Timestamped once the reply is ready, i.e. when the request completes.
+                function, address, count = pdu[0], *struct.unpack(">HH", pdu[1:5])
+                self.events.append(
+                    BusEvent(time.monotonic(), function, address, 1 if function == 6 else count, response[0] < 0x80)
+                )
+            return response
+
+    def _process(self, pdu: bytes) -> bytes:
+        function = pdu[0]
+        if function in (3, 4):
+            address, count = struct.unpack(">HH", pdu[1:5])
+            memory = self.memory["holding" if function == 3 else "input"]
+            if not 1 <= count <= 125:
+                return bytes((function | 0x80, EXC_ILLEGAL_ADDRESS))
+            if count > self.config.max_count:
+                return bytes((function | 0x80, EXC_ILLEGAL_VALUE))
+            addresses = range(address, address + count)
+            if self.config.strict and any(a not in memory for a in addresses):
+                return bytes((function | 0x80, EXC_ILLEGAL_ADDRESS))
+            words = [memory.get(a, 0) for a in addresses]
+            return bytes((function, 2 * count)) + struct.pack(f">{count}H", *words)
+        if function == 6:
+            address, value = struct.unpack(">HH", pdu[1:5])
+            if self.config.strict and address not in self.memory["holding"]:
+                return bytes((function | 0x80, EXC_ILLEGAL_ADDRESS))
+            self.memory["holding"][address] = value
+            return pdu[:5]
+        if function == 16:
+            address, count, _ = struct.unpack(">HHB", pdu[1:6])
+            values = struct.unpack(f">{count}H", pdu[6 : 6 + 2 * count])
+            if self.config.strict and any(address + i not in self.memory["holding"] for i in range(count)):
+                return bytes((function | 0x80, EXC_ILLEGAL_ADDRESS))
+            for offset, value in enumerate(values):
+                self.memory["holding"][address + offset] = value
+            return pdu[:5]
+        return bytes((function | 0x80, EXC_ILLEGAL_FUNCTION))
+
+
+def _crc16(frame: bytes) -> int:
+    """Modbus RTU CRC (poly 0xA001, init 0xFFFF), sent low byte first."""
+
+    crc = 0xFFFF
+    for byte in frame:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", type=Path, default=DEFAULT_PROFILE)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds per request")
+    parser.add_argument("--drop", type=float, default=0.0, help="share of requests left unanswered (0..1)")
+    parser.add_argument("--drift-interval", type=float, default=5.0, help="seconds between value drift steps")
+    parser.add_argument("--unit", type=int, default=None, help="only answer this unit id")
+    parser.add_argument("--strict", action="store_true", help="reject reads of unmapped addresses")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--word-time", type=float, default=0.0, help="extra seconds per register read")
+    parser.add_argument("--max-count", type=int, default=125, help="largest read answered (gateway buffer)")
+    parser.add_argument("--framing", choices=("tcp", "rtu"), default="tcp", help="rtu = raw RTU frames over TCP")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    config = SimulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+        drift_interval=args.drift_interval,
+        strict=args.strict,
+        unit_id=args.unit,
+        seed=args.seed,
+        framing=args.framing,
+        word_time=args.word_time,
+        max_count=args.max_count,
+    )
+    simulator = SimulatedED300.from_file(args.profile, config)
+    port = await simulator.start(args.host, args.port)
+    print(f"ED300 simulator listening on {args.host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(_parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+"""Tests for the EcoDesign heat pump integration."""
@@ -0,0 +1,79 @@
+"""Fixtures: a simulated ED300 on localhost and a config entry pointing at it."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ecodesign_heatpump.const import (
+    CONF_HOST,
+    CONF_MODEL,
+    CONF_PORT,
+    CONF_SCAN_INTERVAL,
+    CONF_TRANSPORT,
+    CONF_UNIT_ID,
+    DEFAULT_MODEL,
+    DOMAIN,
+    TRANSPORT_TCP,
+)
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "scripts"))
+from modbus_simulator import SimulatedED300, SimulatorConfig  # noqa: E402
+
+UNIT_ID = 3
+
+
+async def async_first_poll(hass, entry: MockConfigEntry):
+    """The entry's coordinator once its first poll (a background task) has run."""
+
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async with asyncio.timeout(5):
+        while coordinator.stats.polls == 0:
+            await asyncio.sleep(0.01)
+    return coordinator
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+async def simulator(socket_enabled):
+    sim = SimulatedED300.from_file(config=SimulatorConfig(drift_interval=0, unit_id=UNIT_ID))
+    sim.port = await sim.start("127.0.0.1", 0)
+    yield sim
+    await sim.stop()
+
+
+@pytest.fixture
+def config_entry(hass, simulator) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=f"ED300 @ 127.0.0.1 (unit {UNIT_ID})",
+        unique_id=f"127.0.0.1:{simulator.port}:{UNIT_ID}",
+        data={
+            CONF_TRANSPORT: TRANSPORT_TCP,
+            CONF_HOST: "127.0.0.1",
+            CONF_PORT: simulator.port,
+            CONF_UNIT_ID: UNIT_ID,
+            CONF_MODEL: DEFAULT_MODEL,
+            CONF_SCAN_INTERVAL: 30,
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+async def loaded_entry(hass, config_entry) -> MockConfigEntry:
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await async_first_poll(hass, config_entry)
+    yield config_entry
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
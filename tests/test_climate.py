@@ -0,0 +1,63 @@
+"""Water heater thermostat entity."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN, SERVICE_SET_TEMPERATURE, HVACMode
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, SERVICE_TURN_OFF, SERVICE_TURN_ON
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.ecodesign_heatpump.const import DOMAIN
+
+WRITES = (6, 16)
+
+
+def _entity_id(hass, entry) -> str:
+    return next(
+        entity.entity_id
+        for entity in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        if entity.domain == CLIMATE_DOMAIN
+    )
+
+
+async def test_clicks_collapse_into_one_write(hass, loaded_entry, simulator) -> None:
+    entity_id = _entity_id(hass, loaded_entry)
+    state = hass.states.get(entity_id)
+    assert state.attributes["temperature"] == hass.data[DOMAIN][loaded_entry.entry_id].data["setpoint"]
+
+    # Three thermostat clicks within the settle delay.
+    calls = []
+    for value in (50, 51, 52):
+        calls.append(
+            asyncio.create_task(
+                hass.services.async_call(
+                    CLIMATE_DOMAIN,
+                    SERVICE_SET_TEMPERATURE,
+                    {ATTR_ENTITY_ID: entity_id, ATTR_TEMPERATURE: value},
+                    blocking=True,
+                )
+            )
+        )
+        await asyncio.sleep(0.1)
+    assert hass.states.get(entity_id).attributes["temperature"] == 52  # optimistic
+    async with asyncio.timeout(10):
+        await asyncio.gather(*calls)
+
+    writes = [event for event in simulator.events if event.function in WRITES]
+    assert len(writes) == 1
+    assert writes[0].address == 4
+    assert simulator.memory["holding"][4] == 52
+
+
+async def test_turn_off_and_on(hass, loaded_entry, simulator) -> None:
+    entity_id = _entity_id(hass, loaded_entry)
+    setpoint = hass.states.get(entity_id).attributes["temperature"]
+
+    await hass.services.async_call(CLIMATE_DOMAIN, SERVICE_TURN_OFF, {ATTR_ENTITY_ID: entity_id}, blocking=True)
+    assert simulator.memory["holding"][4] == 0
+    assert hass.states.get(entity_id).state == HVACMode.OFF
+
+    await hass.services.async_call(CLIMATE_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: entity_id}, blocking=True)
+    assert simulator.memory["holding"][4] == setpoint
+    assert hass.states.get(entity_id).state == HVACMode.HEAT
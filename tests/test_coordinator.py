@@ -0,0 +1,27 @@
+"""Coordinator read path against the simulator."""
+
+from __future__ import annotations
+
+from .conftest import async_first_poll
+
+
+async def test_rejected_blocks_are_split_once(hass, config_entry, simulator) -> None:
+    # Firmware that rejects reads touching unmapped addresses: the bridged plan fails.
+    simulator.config.strict = True
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    coordinator = await async_first_poll(hass, config_entry)
+    assert coordinator.last_update_success, coordinator.last_exception
+    first = dict(coordinator.data)
+    assert coordinator._block_runs
+
+    # Later sweeps go straight to the learned runs: no block rejected again, nothing missing.
+    requests = simulator.requests
+    coordinator._block_due = [0.0] * len(coordinator.read_plan)
+    await coordinator.async_refresh()
+    runs = sum(len(runs) for runs in coordinator._block_runs.values())
+    whole = len(coordinator.read_plan) - len(coordinator._block_runs)
+    assert simulator.requests - requests == runs + whole
+    assert coordinator.data.keys() == first.keys()
+
+    await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,74 @@
+"""Register discovery: the sweep and the options-flow step."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.ecodesign_heatpump.connection import ModbusTimeoutError
+from custom_components.ecodesign_heatpump.const import (
+    CONF_DISCOVERY_INTERVAL,
+    CONF_DISCOVERY_SAMPLES,
+    CONF_HOLDING_RANGE,
+    CONF_INPUT_RANGE,
+    DOMAIN,
+)
+from custom_components.ecodesign_heatpump.discovery import discover
+
+from .test_options_flow import _open
+
+
+async def test_timeouts_do_not_end_the_sweep() -> None:
+    mapped = set(range(0, 10)) | set(range(40, 50))
+
+    async def _read(reg_type: str, address: int, count: int) -> list[int] | None:
+        addresses = range(address, address + count)
+        if 20 in addresses:
+            raise asyncio.TimeoutError("no answer")
+        return [address] * count if all(a in mapped for a in addresses) else None
+
+    result = await discover(_read, {"input": (0, 64)}, block_size=64, samples=1)
+    assert {address for _, address in result.samples} == mapped
+    assert result.timeouts == 7  # 64, 32, ... 1 words around address 20
+    assert result.rejected >= result.timeouts
+
+
+async def test_discover_step(hass, loaded_entry, tmp_path) -> None:
+    hass.config.config_dir = str(tmp_path)
+    coordinator = hass.data[DOMAIN][loaded_entry.entry_id]
+    connection = coordinator.connection
+    read = connection.async_read
+
+    async def _read(reg_type, address, count, unit, priority):
+        if reg_type == "holding" and address <= 20 < address + count:
+            # What the connection does when the unit leaves a request unanswered.
+            connection._record_unit_failure(unit, asyncio.TimeoutError())
+            raise ModbusTimeoutError("No response received")
+        return await read(reg_type, address, count, unit, priority)
+
+    connection.async_read = _read
+
+    result = await _open(hass, loaded_entry, "discover")
+    assert result["step_id"] == "discover"
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_INPUT_RANGE: "0-32",
+            CONF_HOLDING_RANGE: "0-32",
+            CONF_DISCOVERY_SAMPLES: 1,
+            CONF_DISCOVERY_INTERVAL: 1,
+        },
+    )
+    assert result["type"] == FlowResultType.SHOW_PROGRESS
+    await hass.async_block_till_done()
+
+    result = await hass.config_entries.options.async_configure(result["flow_id"])
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "discovery_saved"
+    draft = json.loads((tmp_path / f"{DOMAIN}_discovered_{coordinator.unit_id}.json").read_text())
+    assert draft["registers"]["sensors"]
+    assert draft["discovery"]["timeouts"] == 6  # 32, 16, ... 1 words around holding 20
+    # The provoked timeouts left the unit's polling alone.
+    assert connection.unit_failures == {}
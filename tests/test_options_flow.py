@@ -0,0 +1,115 @@
+"""Options flow: every menu entry opens and its settings reach the entry."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.ecodesign_heatpump.const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_BUS_TRACE,
+    CONF_FAST_INTERVAL,
+    CONF_FRAME_DELAY,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_SCAN_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_TRANSPORT,
+    DOMAIN,
+    TRANSPORT_RTU_OVER_TCP,
+)
+from custom_components.ecodesign_heatpump.trace import load_trace
+
+
+async def _open(hass, entry, step: str):
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.MENU
+    assert step in result["menu_options"]
+    return await hass.config_entries.options.async_configure(result["flow_id"], {"next_step_id": step})
+
+
+async def test_settings(hass, loaded_entry) -> None:
+    result = await _open(hass, loaded_entry, "settings")
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "settings"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_SCAN_INTERVAL: 20, CONF_FAST_INTERVAL: 3, CONF_SLOW_INTERVAL: 600},
+    )
+    await hass.async_block_till_done()
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert loaded_entry.options[CONF_FAST_INTERVAL] == 3
+
+    # The entry reloads with the new tiers.
+    coordinator = hass.data[DOMAIN][loaded_entry.entry_id]
+    assert coordinator.poll_intervals["fast"] == 3
+    assert coordinator.poll_intervals["slow"] == 600
+
+
+async def test_adaptive_polling_toggle(hass, loaded_entry) -> None:
+    assert not hass.data[DOMAIN][loaded_entry.entry_id].adaptive.enabled
+
+    result = await _open(hass, loaded_entry, "settings")
+    await hass.config_entries.options.async_configure(result["flow_id"], {CONF_ADAPTIVE_POLLING: True})
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][loaded_entry.entry_id].adaptive.enabled
+
+    result = await _open(hass, loaded_entry, "settings")
+    await hass.config_entries.options.async_configure(result["flow_id"], {CONF_ADAPTIVE_POLLING: False})
+    await hass.async_block_till_done()
+    assert not hass.data[DOMAIN][loaded_entry.entry_id].adaptive.enabled
+
+
+async def test_link_tuning(hass, loaded_entry) -> None:
+    result = await _open(hass, loaded_entry, "settings")
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_FRAME_DELAY: 50, CONF_MAX_BLOCK_SIZE: 16}
+    )
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][loaded_entry.entry_id]
+    assert coordinator.connection.frame_delay == 0.05
+    assert coordinator.max_block_size == 16
+    assert all(block.count <= 16 for block in coordinator._read_plan)
+
+
+async def test_link_tuning_defaults_follow_transport(hass, config_entry) -> None:
+    entry = MockConfigEntry(domain=DOMAIN, data={**config_entry.data, CONF_TRANSPORT: TRANSPORT_RTU_OVER_TCP})
+    entry.add_to_hass(hass)
+
+    result = await _open(hass, entry, "settings")
+    defaults = {str(key): key.default() for key in result["data_schema"].schema}
+    assert defaults[CONF_FRAME_DELAY] == 20
+    assert defaults[CONF_MAX_BLOCK_SIZE] == 64
+
+
+async def test_bus_trace_toggle(hass, loaded_entry, tmp_path) -> None:
+    hass.config.config_dir = str(tmp_path)
+
+    result = await _open(hass, loaded_entry, "settings")
+    await hass.config_entries.options.async_configure(result["flow_id"], {CONF_BUS_TRACE: True})
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][loaded_entry.entry_id]
+    trace = coordinator.connection.trace
+    assert trace is not None
+    assert Path(trace.path).parent == tmp_path
+
+    # Unloading flushes the recorder; the first refresh is in the file.
+    await hass.config_entries.async_unload(loaded_entry.entry_id)
+    await hass.async_block_till_done()
+    header, records = load_trace([trace.path])
+    assert header["transport"] == "tcp"
+    assert records and all(record["u"] == coordinator.unit_id and "r" in record for record in records)
+
+
+async def test_link_probe(hass, loaded_entry) -> None:
+    result = await _open(hass, loaded_entry, "probe")
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "probe"
+
+    await hass.config_entries.options.async_configure(result["flow_id"], {})
+    await hass.async_block_till_done()
+    assert loaded_entry.options[CONF_MAX_BLOCK_SIZE] == 125
+    assert hass.data[DOMAIN][loaded_entry.entry_id].max_block_size == 125
@@ -0,0 +1,54 @@
+"""PV-surplus controller set up through the options flow."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from homeassistant.const import UnitOfPower
+
+from custom_components.ecodesign_heatpump.const import (
+    CONF_PV_EXPORT_POSITIVE,
+    CONF_PV_GRID_ENTITY,
+    CONF_PV_WINDOW,
+    DOMAIN,
+)
+
+from .conftest import async_first_poll
+from .test_options_flow import _open
+
+GRID = "sensor.grid_power"
+
+
+async def test_enable_through_options(hass, loaded_entry, simulator) -> None:
+    hass.states.async_set(GRID, "0", {"device_class": "power", "unit_of_measurement": UnitOfPower.WATT})
+    assert hass.data[DOMAIN][loaded_entry.entry_id].pv_controller is None
+
+    result = await _open(hass, loaded_entry, "pv")
+    assert result["step_id"] == "pv"
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_PV_GRID_ENTITY: GRID, CONF_PV_EXPORT_POSITIVE: True, CONF_PV_WINDOW: 10}
+    )
+    coordinator = await async_first_poll(hass, loaded_entry)
+    controller = coordinator.pv_controller
+    assert controller is not None and controller.entity_id == GRID
+    assert coordinator.data["pv_mode"] == 0  # "Aus"
+
+    # A full window of export covering heat pump and heating rod selects "WP+EL".
+    controller.window.add(time.monotonic() - 10, 5000.0)
+    hass.states.async_set(GRID, "5000", {"device_class": "power", "unit_of_measurement": UnitOfPower.WATT})
+    await hass.async_block_till_done()
+    assert controller.target == "both"
+    # The write runs as an entry background task, which block_till_done does not wait for.
+    async with asyncio.timeout(5):
+        while controller._writing:
+            await asyncio.sleep(0.01)
+    assert controller.writes == 1, controller.last_error
+    assert simulator.memory["holding"][17] == 3
+
+    # An emptied sensor field turns the controller off again.
+    result = await _open(hass, loaded_entry, "pv")
+    await hass.config_entries.options.async_configure(result["flow_id"], {})
+    await hass.async_block_till_done()
+    assert CONF_PV_GRID_ENTITY not in loaded_entry.options
+    assert hass.data[DOMAIN][loaded_entry.entry_id].pv_controller is None
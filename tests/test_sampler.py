@@ -0,0 +1,38 @@
+"""High-rate sampling set up through the options flow."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.ecodesign_heatpump.const import (
+    CONF_SAMPLE_INTERVAL,
+    CONF_SAMPLE_KEYS,
+    CONF_SAMPLE_PUBLISH_INTERVAL,
+    DOMAIN,
+)
+
+from .test_options_flow import _open
+
+
+async def test_enable_through_options(hass, loaded_entry) -> None:
+    assert hass.data[DOMAIN][loaded_entry.entry_id].sampler is None
+
+    result = await _open(hass, loaded_entry, "sampling")
+    assert result["step_id"] == "sampling"
+    await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_SAMPLE_KEYS: ["ww_temp"], CONF_SAMPLE_INTERVAL: 2, CONF_SAMPLE_PUBLISH_INTERVAL: 60},
+    )
+    await hass.async_block_till_done()
+    sampler = hass.data[DOMAIN][loaded_entry.entry_id].sampler
+    assert sampler is not None
+    assert sampler.keys == ["ww_temp"]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=3))
+    await hass.async_block_till_done()
+    assert sampler.samples == 1
+    assert all(sampler.words(index) is not None for index in sampler.blocks)
+    assert sampler.as_dict()["current_hour"]["ww_temp"]["samples"] == 1